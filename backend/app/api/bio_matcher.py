@@ -1,18 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Response
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union, BinaryIO
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import io
+import os
+import hashlib
+import asyncio
 import base64
 import json
 import csv
+import logging
 from ..services.intelligent_merger import IntelligentMerger
 from ..services.data_context import DataContextManager, data_context_manager
-from ..services.data_analyzer import DataAnalyzer
+from ..services.data_analyzer import DataAnalyzer, DataFrameSchema, data_analyzer, compute_correlation_matrix, downcast_float_columns, downcast_numeric_columns
 from ..services.simple_visualizer import simple_visualizer
 from ..database import get_db
+from ..responses import ORJSON_AVAILABLE, FastJSONResponse, json_line
 from services.workflow_state import workflow_state_manager
 import re
 
+logger = logging.getLogger(__name__)
+
+if ORJSON_AVAILABLE:
+    import orjson
+
 # Try to import pandas and numpy, but provide fallbacks if not available
 try:
     import pandas as pd
@@ -20,12 +34,434 @@ try:
     import plotly.graph_objects as go
     import plotly.express as px
     import plotly.utils
+    import plotly.io as pio
+    from plotly.subplots import make_subplots
+    # Plotly loads its default template lazily; do it once at import rather than on the first plot
+    pio.templates[pio.templates.default]
     PANDAS_AVAILABLE = True
 except ImportError:
     PANDAS_AVAILABLE = False
     print("Warning: pandas/numpy not available. Using fallback CSV processing.")
 
-router = APIRouter(prefix="/bio", tags=["bio-matcher"])
+# Arrow is optional; it lets clients upload columnar data without a CSV round-trip
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Numba is optional; it compiles the per-column summary statistics into one loop
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# RapidFuzz scores string similarity in C++ when installed; fuzzywuzzy has the same fuzz API,
+# but its partial_ratio aligns heuristically and can score lower on reordered words
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    from fuzzywuzzy import fuzz
+    RAPIDFUZZ_AVAILABLE = False
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Rows encoded per chunk of a streamed NDJSON table
+NDJSON_CHUNK_ROWS = 10_000
+
+# Documents that the "file" form field accepts CSV or an Arrow IPC stream
+ARROW_UPLOAD_OPENAPI = {
+    "requestBody": {
+        "content": {
+            "multipart/form-data": {
+                "encoding": {"file": {"contentType": f"text/csv, {ARROW_STREAM_MEDIA_TYPE}"}}
+            }
+        }
+    }
+}
+
+def figure_to_json(fig: "go.Figure") -> str:
+    """
+    Encode a Plotly figure as JSON text.
+    With orjson the figure dict is written in C. Plotly already packs numeric
+    arrays as base64; anything else that isn't plain JSON (object or datetime
+    arrays, Timestamps) is passed to Plotly's own encoder, so the output
+    decodes the same as with PlotlyJSONEncoder.
+    """
+    if not ORJSON_AVAILABLE:
+        return json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return orjson.dumps(
+        fig.to_plotly_json(),
+        default=plotly.utils.PlotlyJSONEncoder().default,
+        option=orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+def accepts_arrow(accept: Optional[str]) -> bool:
+    """Whether the client asked for an Arrow IPC stream in its Accept header"""
+    return PYARROW_AVAILABLE and accept is not None and ARROW_STREAM_MEDIA_TYPE in accept
+
+def accepts_ndjson(accept: Optional[str]) -> bool:
+    """Whether the client asked for newline-delimited JSON in its Accept header"""
+    return accept is not None and NDJSON_MEDIA_TYPE in accept
+
+def iter_ndjson(content: Dict[str, Any], chunk_rows: int = NDJSON_CHUNK_ROWS):
+    """
+    Yield content as NDJSON: a first line with every field but "rows", then
+    one line per row, chunk_rows rows at a time, so the whole document is
+    never encoded into one body.
+    """
+    yield json_line({key: value for key, value in content.items() if key != "rows"})
+    rows = content.get("rows") or []
+    for start in range(0, len(rows), chunk_rows):
+        yield b"".join(json_line(row) for row in rows[start:start + chunk_rows])
+
+def table_response(df: Optional["pd.DataFrame"], content: Dict[str, Any], accept: Optional[str],
+                   downcast: bool = False) -> Response:
+    """
+    Respond with the table either as JSON rows or, when the client accepts it,
+    as an Arrow IPC stream of df. The Arrow response carries every other field
+    of content as JSON in the schema metadata under b"response"; frames Arrow
+    can't hold are sent as JSON. With downcast, the Arrow columns use float32
+    and the smallest integer types. Clients accepting NDJSON get content
+    streamed by iter_ndjson instead.
+    """
+    if df is not None and accepts_arrow(accept):
+        if downcast:
+            df = downcast_numeric_columns(df)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowException, TypeError, ValueError):
+            table = None
+        if table is not None:
+            fields = {key: value for key, value in content.items() if key != "rows"}
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                b"response": FastJSONResponse(fields).body
+            })
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return Response(content=sink.getvalue().to_pybytes(), media_type=ARROW_STREAM_MEDIA_TYPE)
+    if accepts_ndjson(accept):
+        return StreamingResponse(iter_ndjson(content), media_type=NDJSON_MEDIA_TYPE)
+    return FastJSONResponse(content)
+
+def state_etag(*parts: Any) -> str:
+    """Weak ETag naming a version of some session state, built from the parts that identify it"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def revalidate(etag: str, if_none_match: Optional[str], response: Response) -> Optional[Response]:
+    """
+    Conditional GET for polled endpoints: a 304 Not Modified response when the
+    client's If-None-Match already names etag, otherwise None after tagging the
+    response the endpoint goes on to build. Clients must revalidate every time.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match:
+        client_tags = [tag.strip() for tag in if_none_match.split(",")]
+        if etag in client_tags or "*" in client_tags:
+            return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+router = APIRouter(prefix="/bio", tags=["bio-matcher"], default_response_class=FastJSONResponse)
+
+# Cells read as missing, matching pandas.read_csv's default na_values
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+
+def arrow_to_pandas(table: "pa.Table") -> "pd.DataFrame":
+    """
+    Convert a freshly parsed Arrow table that nothing else references.
+    Each column's Arrow buffers are released as soon as it has been moved
+    into its own pandas block, so parsing a file doesn't hold two full copies.
+    """
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def may_hold_wide_integers(column: "pa.ChunkedArray") -> bool:
+    """Whether a double column Arrow inferred has values at or beyond int64's range"""
+    values = column.to_numpy()
+    return bool(np.any(np.abs(values[~np.isnan(values)]) >= 2.0 ** 63))
+
+def parse_wide_integers(text: "pd.Series") -> "pd.Series":
+    """
+    A column of number text holding integers beyond int64, typed like
+    pd.read_csv does: uint64 when every value is a non-negative integer that
+    fits, the original text when they are integers that don't, else float64.
+    """
+    values = text.dropna()
+    if values.str.fullmatch(r"-?\d+").all():
+        if len(values) == len(text) and values.str.fullmatch(r"\d+").all():
+            numbers = [int(value) for value in values]
+            if max(numbers) < 2 ** 64:
+                return pd.Series(numbers, index=text.index, dtype=np.uint64, name=text.name)
+        return text.astype(object)
+    return pd.to_numeric(text)
+
+def read_csv_table(source: Union[bytes, BinaryIO]) -> "pd.DataFrame":
+    """
+    Parse CSV bytes or a binary file object into a DataFrame.
+    With pyarrow the raw bytes go through its multi-threaded CSV reader, using
+    pandas' missing-value markers and keeping dates as text like pandas does,
+    without decoding the file to a str first.
+    Files Arrow rejects (ragged rows, repeated headers) fall back to pd.read_csv.
+    """
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    if PYARROW_AVAILABLE:
+        start = source.tell()
+        try:
+            table = pacsv.read_csv(source, convert_options=pacsv.ConvertOptions(
+                null_values=CSV_NULL_VALUES, strings_can_be_null=True
+            ))
+            temporal_types = {
+                field.name: pa.string() for field in table.schema if pa.types.is_temporal(field.type)
+            }
+            # Arrow reads integers beyond int64 as doubles, losing digits pandas keeps
+            wide_integer_types = {
+                field.name: pa.string() for field, column in zip(table.schema, table.columns)
+                if pa.types.is_floating(field.type) and may_hold_wide_integers(column)
+            }
+            if temporal_types or wide_integer_types:
+                # Re-read those columns as plain strings
+                source.seek(start)
+                table = pacsv.read_csv(source, convert_options=pacsv.ConvertOptions(
+                    null_values=CSV_NULL_VALUES, strings_can_be_null=True,
+                    column_types={**temporal_types, **wide_integer_types}
+                ))
+            if len(set(table.column_names)) == table.num_columns:
+                df = arrow_to_pandas(table)
+                for name in wide_integer_types:
+                    df[name] = parse_wide_integers(df[name])
+                return df
+        except pa.ArrowInvalid:
+            pass
+        source.seek(start)
+    return pd.read_csv(source)
+
+# Dedicated pool for parsing uploads, so large CSVs don't take over FastAPI's shared threadpool
+_csv_pool = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="csv-parser"
+)
+
+async def parse_csv_upload(file: UploadFile) -> "pd.DataFrame":
+    """Parse an uploaded CSV on the parser pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_csv_pool, read_csv_table, file.file)
+
+def read_uploaded_table(content: Union[bytes, BinaryIO], content_type: Optional[str]) -> "pd.DataFrame":
+    """
+    Parse an upload as an Arrow IPC stream or, by default, as CSV.
+    content may be the raw bytes or the upload's binary file object, which
+    is handed straight to the parser without a decoded in-memory copy.
+    """
+    if content_type == ARROW_STREAM_MEDIA_TYPE:
+        if not PYARROW_AVAILABLE:
+            raise HTTPException(
+                status_code=415,
+                detail="Arrow uploads are not supported by this server. Please upload a CSV file."
+            )
+        source = pa.py_buffer(content) if isinstance(content, bytes) else content
+        return arrow_to_pandas(pa.ipc.open_stream(source).read_all())
+    return read_csv_table(content)
+
+# Refuse merges whose duplicate keys would multiply out beyond this many rows
+MAX_MERGE_ROWS = 1_000_000
+
+def estimate_outer_merge_rows(left_keys: "pd.Series", right_keys: "pd.Series") -> int:
+    """Row count of an outer merge on these keys, from the per-key counts on each side"""
+    counts = pd.concat(
+        [left_keys.value_counts(dropna=False), right_keys.value_counts(dropna=False)],
+        axis=1
+    ).fillna(0)
+    left_counts, right_counts = counts.iloc[:, 0].to_numpy(), counts.iloc[:, 1].to_numpy()
+    # Matched keys pair every left row with every right row; keys on one side only pass through
+    return int(np.maximum(left_counts, 1).dot(np.maximum(right_counts, 1)))
+
+def outer_merge(left: "pd.DataFrame", right: "pd.DataFrame", on: str) -> "pd.DataFrame":
+    """
+    Outer-join two DataFrames on one key column, like pd.merge(how='outer').
+    When the keys are unique and non-null on both sides (the usual sample-ID
+    case) the join runs on pyarrow's multi-threaded hash join; otherwise, or
+    for column types Arrow can't convert, it falls back to pandas.
+    """
+    if PYARROW_AVAILABLE:
+        left_keys, right_keys = left[on], right[on]
+        if (left_keys.notna().all() and right_keys.notna().all()
+                and left_keys.is_unique and right_keys.is_unique):
+            try:
+                joined = pa.Table.from_pandas(left, preserve_index=False).join(
+                    pa.Table.from_pandas(right, preserve_index=False),
+                    keys=on,
+                    join_type="full outer",
+                    left_suffix="_x",
+                    right_suffix="_y",
+                    coalesce_keys=True
+                )
+                # pandas sorts the keys of an outer join; keep the same row order
+                return joined.sort_by([(on, "ascending")]).to_pandas()
+            except (pa.ArrowException, TypeError, ValueError):
+                pass
+    
+    # Duplicate keys multiply out; check the size before pandas materializes it
+    if not (left[on].is_unique and right[on].is_unique):
+        expected_rows = estimate_outer_merge_rows(left[on], right[on])
+        if expected_rows > MAX_MERGE_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Merging on '{on}' would produce {expected_rows} rows because of duplicate "
+                       f"{on} values. Please make the {on} values unique before merging."
+            )
+    return pd.merge(left, right, on=on, how='outer')
+
+def outer_merge_all(dataframes: List["pd.DataFrame"], on: str) -> "pd.DataFrame":
+    """
+    Outer-join any number of DataFrames on one key column, with the same
+    result as chaining outer_merge. When every file has unique, non-null keys
+    and no other column name is shared (so no suffixes are needed), all joins
+    run on Arrow tables with a single sort and pandas conversion at the end.
+    """
+    value_columns = [col for df in dataframes for col in df.columns if col != on]
+    if (PYARROW_AVAILABLE and len(set(value_columns)) == len(value_columns)
+            and all(df[on].notna().all() and df[on].is_unique for df in dataframes)):
+        try:
+            joined = pa.Table.from_pandas(dataframes[0], preserve_index=False)
+            for df in dataframes[1:]:
+                joined = joined.join(
+                    pa.Table.from_pandas(df, preserve_index=False),
+                    keys=on,
+                    join_type="full outer",
+                    coalesce_keys=True
+                )
+            # pandas sorts the keys of an outer join; keep the same row order
+            return joined.sort_by([(on, "ascending")]).to_pandas()
+        except (pa.ArrowException, TypeError, ValueError):
+            pass
+    
+    merged_df = dataframes[0]
+    for df in dataframes[1:]:
+        merged_df = outer_merge(merged_df, df, on)
+    return merged_df
+
+def count_matched_rows(dataframes: List["pd.DataFrame"], merged_df: "pd.DataFrame", on: str) -> int:
+    """Number of merged rows whose key occurs in every one of the input files"""
+    common_keys = pd.Index(dataframes[0][on].dropna().unique())
+    for df in dataframes[1:]:
+        common_keys = common_keys.intersection(df[on].dropna().unique())
+    return int(merged_df[on].isin(common_keys).sum())
+
+def categorize_repeated_strings(df: "pd.DataFrame", max_unique_ratio: float = 0.5) -> "pd.DataFrame":
+    """
+    Return df with low-cardinality string columns (such as Mutation) stored as
+    category, so grouping and comparisons work on integer codes.
+    """
+    object_cols = df.select_dtypes(include=['object']).columns
+    unique_ratio = df[object_cols].nunique() / max(len(df), 1)
+    repeated_cols = unique_ratio.index[unique_ratio < max_unique_ratio]
+    if len(repeated_cols) == 0:
+        return df
+    return df.astype({col: 'category' for col in repeated_cols})
+
+def python_cell(cell: Any) -> Any:
+    """One cell of an object column as a JSON-ready value: bool as 0/1, int and float as is, else str"""
+    if isinstance(cell, bool):
+        return int(cell)
+    if isinstance(cell, int):
+        return cell
+    if isinstance(cell, float):
+        return float(cell)
+    return str(cell)
+
+def dataframe_to_rows(df: "pd.DataFrame") -> List[list]:
+    """
+    Convert a DataFrame to JSON-ready row lists, one column at a time.
+    Missing values become None, numeric columns give Python int/float
+    (booleans as 0/1) and every other column is converted to str.
+    """
+    dtypes = df.dtypes.unique()
+    if len(dtypes) == 1 and dtypes[0].kind in "iuf":
+        # One numeric dtype and no gaps: NumPy boxes straight to int/float without an object copy
+        values = df.to_numpy()
+        if dtypes[0].kind != "f" or not np.isnan(values).any():
+            return values.tolist()
+    
+    # Fill one object matrix column by column; NaN cells are set to None with a mask
+    converted = np.empty(df.shape, dtype=object)
+    for position, (_, series) in enumerate(df.items()):
+        if pd.api.types.is_bool_dtype(series):
+            values = series.to_numpy(dtype=np.int64).astype(object)
+        elif pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy().astype(object)
+        elif series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) != "string":
+            # Mixed cells, e.g. a bool column with gaps: Python numbers stay numbers
+            # (booleans as 0/1) and the rest become str, as the per-cell loop did
+            values = np.array([python_cell(cell) for cell in series.to_numpy()], dtype=object)
+        else:
+            # Box first so datetimes format like str(Timestamp), as the per-cell loop did
+            values = series.astype(object).astype(str).to_numpy()
+        missing = series.isna().to_numpy()
+        if missing.any():
+            values[missing] = None
+        converted[:, position] = values
+    return converted.tolist()
+
+# Column names containing any of these are treated as merge keys
+ID_COLUMN_PATTERN = re.compile(r'id|key|identifier|name', re.IGNORECASE)
+
+def merge_dataframes(dataframes: List["pd.DataFrame"]) -> Tuple["pd.DataFrame", Dict[str, Any], str, set]:
+    """
+    Outer-merge the given files on their shared ID column.
+    Returns the merged DataFrame, the JSON-ready merged_data payload, the
+    merge column and the columns common to every file.
+    """
+    # Find common columns across all files
+    common_columns = set(dataframes[0].columns).intersection(*(df.columns for df in dataframes[1:]))
+    
+    # Look for ID-like columns (case insensitive)
+    id_columns = [col for col in common_columns if ID_COLUMN_PATTERN.search(col)]
+    
+    if not id_columns:
+        # If no obvious ID columns, use the first common column
+        if common_columns:
+            merge_column = list(common_columns)[0]
+            id_columns = [merge_column]
+        else:
+            raise HTTPException(
+                status_code=400, 
+                detail="No common columns found for merging. Files must have at least one column in common."
+            )
+    
+    # Use the first (or best) ID column for merging
+    merge_column = id_columns[0]
+    
+    # Merge all dataframes on the identified column
+    merged_df = outer_merge_all(dataframes, merge_column)
+    
+    # Calculate statistics
+    total_rows = len(merged_df)
+    matched_rows = count_matched_rows(dataframes, merged_df, merge_column)
+    
+    # Convert to list format for response, with NaN/numpy values made JSON-safe
+    headers = merged_df.columns.tolist()
+    merged_data = {
+        "headers": headers,
+        "rows": dataframe_to_rows(merged_df),
+        "totalRows": total_rows,
+        "matchedRows": matched_rows,
+        "unmatchedRows": total_rows - matched_rows,
+        "dataframe_info": {
+            "shape": merged_df.shape,
+            "columns": headers,
+            "numeric_columns": merged_df.select_dtypes(include=[np.number]).columns.tolist()
+        }
+    }
+    return merged_df, merged_data, merge_column, common_columns
 
 @router.post("/create-workflow-session")
 async def create_workflow_session():
@@ -60,6 +496,8 @@ async def clear_workflow_session(session_id: str):
 async def upload_single_file(
     file: UploadFile = File(...),
     session_id: Optional[str] = Form(None),
+    downcast: bool = Form(False),
+    accept: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -79,41 +517,27 @@ async def upload_single_file(
                 detail="Please upload a valid CSV file"
             )
         
-        # Read the CSV file
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+        # Parse the CSV straight from the spooled upload, off the event loop
+        df = await parse_csv_upload(file)
+        headers = df.columns.tolist()
+        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
         
         # Track uploaded file in context
         uploaded_file_id = None
         if session_id:
             file_id = f"file_0_{file.filename}"
-            numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
             uploaded_file_id = data_context_manager.add_uploaded_file(
                 session_id=session_id,
                 file_id=file_id,
                 filename=file.filename,
-                file_size=len(content),
-                columns=df.columns.tolist(),
+                file_size=file.size,
+                columns=headers,
                 row_count=len(df),
                 numeric_columns=numeric_columns
             )
         
         # Convert to list format for response
-        headers = df.columns.tolist()
-        rows = df.values.tolist()
-        
-        # Convert numpy types to Python types for JSON serialization
-        processed_rows = []
-        for row in rows:
-            processed_row = []
-            for cell in row:
-                if pd.isna(cell):
-                    processed_row.append(None)
-                elif isinstance(cell, (int, float)):
-                    processed_row.append(float(cell) if isinstance(cell, float) else int(cell))
-                else:
-                    processed_row.append(str(cell))
-            processed_rows.append(processed_row)
+        processed_rows = dataframe_to_rows(df)
         
         file_data = {
             "headers": headers,
@@ -124,19 +548,19 @@ async def upload_single_file(
             "filename": file.filename,
             "dataframe_info": {
                 "shape": df.shape,
-                "columns": df.columns.tolist(),
-                "numeric_columns": df.select_dtypes(include=[np.number]).columns.tolist()
+                "columns": headers,
+                "numeric_columns": numeric_columns
             }
         }
         
         # Store in workflow session if session_id provided
         if session_id:
             # Store individual file data
-            workflow_state_manager.store_uploaded_file(session_id, file_data)
+            workflow_state_manager.store_uploaded_file(session_id, file_data, df)
             workflow_state_manager.add_workflow_step(session_id, "upload_single_file", {
                 "file_name": file.filename,
                 "total_rows": len(df),
-                "columns": df.columns.tolist()
+                "columns": headers
             })
             
             # Track uploaded file in context
@@ -147,12 +571,12 @@ async def upload_single_file(
                     parent_file_ids=[uploaded_file_id]
                 )
         
-        return {
+        return table_response(df, {
             **file_data,
             "session_id": session_id,
             "workflow_step": "upload_single_file",
             "filename": file.filename
-        }
+        }, accept, downcast)
         
     except Exception as e:
         raise HTTPException(
@@ -164,6 +588,8 @@ async def upload_single_file(
 async def merge_files(
     files: List[UploadFile] = File(...),
     session_id: Optional[str] = Form(None),
+    downcast: bool = Form(False),
+    accept: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -183,15 +609,13 @@ async def merge_files(
                 detail="At least 2 files are required for merging"
             )
         
-        # Read all CSV files and track them in context
-        dataframes = []
+        # Parse all CSV files concurrently; both CSV parsers release the GIL
+        dataframes = list(await asyncio.gather(
+            *(parse_csv_upload(file) for file in files)
+        ))
         uploaded_file_ids = []
         
-        for i, file in enumerate(files):
-            content = await file.read()
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
-            dataframes.append(df)
-            
+        for i, (file, df) in enumerate(zip(files, dataframes)):
             # Track uploaded file in context
             if session_id:
                 file_id = f"file_{i}_{file.filename}"
@@ -200,81 +624,23 @@ async def merge_files(
                     session_id=session_id,
                     file_id=file_id,
                     filename=file.filename or f"file_{i}",
-                    file_size=len(content),
+                    file_size=file.size,
                     columns=df.columns.tolist(),
                     row_count=len(df),
                     numeric_columns=numeric_columns
                 )
                 uploaded_file_ids.append(uploaded_file_id)
         
-        # Find common columns across all files
-        all_columns = [set(df.columns) for df in dataframes]
-        common_columns = set.intersection(*all_columns)
-        
-        # Look for ID-like columns (case insensitive)
-        id_columns = []
-        for col in common_columns:
-            col_lower = col.lower()
-            if any(id_pattern in col_lower for id_pattern in ['id', 'key', 'identifier', 'name']):
-                id_columns.append(col)
-        
-        if not id_columns:
-            # If no obvious ID columns, use the first common column
-            if common_columns:
-                merge_column = list(common_columns)[0]
-                id_columns = [merge_column]
-            else:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="No common columns found for merging. Files must have at least one column in common."
-                )
-        
-        # Use the first (or best) ID column for merging
-        merge_column = id_columns[0]
-        
-        # Merge all dataframes on the identified column
-        merged_df = dataframes[0]
-        for df in dataframes[1:]:
-            merged_df = pd.merge(merged_df, df, on=merge_column, how='outer')
-        
-        # Calculate statistics
-        total_rows = len(merged_df)
-        matched_rows = len(merged_df.dropna(subset=[merge_column]))
-        unmatched_rows = total_rows - matched_rows
-        
-        # Convert to list format for response
-        headers = merged_df.columns.tolist()
-        rows = merged_df.values.tolist()
-        
-        # Convert numpy types to Python types for JSON serialization
-        processed_rows = []
-        for row in rows:
-            processed_row = []
-            for cell in row:
-                if pd.isna(cell):
-                    processed_row.append(None)
-                elif isinstance(cell, (int, float)):
-                    processed_row.append(float(cell) if isinstance(cell, float) else int(cell))
-                else:
-                    processed_row.append(str(cell))
-            processed_rows.append(processed_row)
-        
-        merged_data = {
-            "headers": headers,
-            "rows": processed_rows,
-            "totalRows": total_rows,
-            "matchedRows": matched_rows,
-            "unmatchedRows": unmatched_rows,
-            "dataframe_info": {
-                "shape": merged_df.shape,
-                "columns": merged_df.columns.tolist(),
-                "numeric_columns": merged_df.select_dtypes(include=[np.number]).columns.tolist()
-            }
-        }
+        merged_df, merged_data, merge_column, common_columns = merge_dataframes(dataframes)
+        total_rows = merged_data["totalRows"]
+        matched_rows = merged_data["matchedRows"]
+        unmatched_rows = merged_data["unmatchedRows"]
         
         # Store in workflow session if session_id provided
         if session_id:
-            workflow_state_manager.store_merged_data(session_id, merged_data)
+            workflow_state_manager.store_merged_data(
+                session_id, merged_data, categorize_repeated_strings(merged_df)
+            )
             workflow_state_manager.add_workflow_step(session_id, "merge_files", {
                 "files_count": len(files),
                 "file_names": [f.filename for f in files],
@@ -290,14 +656,16 @@ async def merge_files(
                 parent_file_ids=uploaded_file_ids
             )
         
-        return {
+        return table_response(merged_df, {
             **merged_data,
             "session_id": session_id,
             "workflow_step": "merge_files",
             "merge_column": merge_column,
             "common_columns": list(common_columns)
-        }
+        }, accept, downcast)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -308,6 +676,8 @@ async def merge_files(
 async def merge_session_files(
     session_id: str = Form(...),
     force_remerge: bool = Form(False),
+    downcast: bool = Form(False),
+    accept: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
     """
@@ -333,6 +703,21 @@ async def merge_session_files(
                 detail="Session not found or expired"
             )
         
+        # Check if these same uploads were already merged and force_remerge is False;
+        # a stored merge of the current uploads is returned before any other work
+        merge_key = workflow_state_manager.get_uploaded_files_key(session_id)
+        if merge_key is not None and not force_remerge:
+            existing_merged_data = workflow_state_manager.get_merged_data(session_id, source_key=merge_key)
+            if existing_merged_data:
+                existing_merged_df = workflow_state_manager.get_merged_frame(session_id) if accepts_arrow(accept) else None
+                return table_response(existing_merged_df, {
+                    **existing_merged_data,
+                    "session_id": session_id,
+                    "workflow_step": "merge_session_files",
+                    "message": "Using previously merged data. Set force_remerge=true to re-merge.",
+                    "cached": True
+                }, accept, downcast)
+        
         # Get all uploaded files from session
         uploaded_files = workflow_state_manager.get_uploaded_files(session_id)
         if len(uploaded_files) < 2:
@@ -341,91 +726,18 @@ async def merge_session_files(
                 detail="At least 2 files are required for merging. Please upload more files first."
             )
         
-        # Check if merge was already performed and force_remerge is False
-        existing_merged_data = workflow_state_manager.get_merged_data(session_id)
-        if existing_merged_data and not force_remerge:
-            return {
-                **existing_merged_data,
-                "session_id": session_id,
-                "workflow_step": "merge_session_files",
-                "message": "Using previously merged data. Set force_remerge=true to re-merge.",
-                "cached": True
-            }
-        
-        # Convert stored file data back to pandas DataFrames
-        dataframes = []
-        for file_data in uploaded_files:
-            # Convert rows back to DataFrame
-            df = pd.DataFrame(file_data['rows'], columns=file_data['headers'])
-            dataframes.append(df)
-        
-        # Find common columns across all files
-        all_columns = [set(df.columns) for df in dataframes]
-        common_columns = set.intersection(*all_columns)
-        
-        # Look for ID-like columns (case insensitive)
-        id_columns = []
-        for col in common_columns:
-            col_lower = col.lower()
-            if any(id_pattern in col_lower for id_pattern in ['id', 'key', 'identifier', 'name']):
-                id_columns.append(col)
-        
-        if not id_columns:
-            # If no obvious ID columns, use the first common column
-            if common_columns:
-                merge_column = list(common_columns)[0]
-                id_columns = [merge_column]
-            else:
-                raise HTTPException(
-                    status_code=400, 
-                    detail="No common columns found for merging. Files must have at least one column in common."
-                )
-        
-        # Use the first (or best) ID column for merging
-        merge_column = id_columns[0]
-        
-        # Merge all dataframes on the identified column
-        merged_df = dataframes[0]
-        for df in dataframes[1:]:
-            merged_df = pd.merge(merged_df, df, on=merge_column, how='outer')
-        
-        # Calculate statistics
-        total_rows = len(merged_df)
-        matched_rows = len(merged_df.dropna(subset=[merge_column]))
-        unmatched_rows = total_rows - matched_rows
-        
-        # Convert to list format for response
-        headers = merged_df.columns.tolist()
-        rows = merged_df.values.tolist()
-        
-        # Convert numpy types to Python types for JSON serialization
-        processed_rows = []
-        for row in rows:
-            processed_row = []
-            for cell in row:
-                if pd.isna(cell):
-                    processed_row.append(None)
-                elif isinstance(cell, (int, float)):
-                    processed_row.append(float(cell) if isinstance(cell, float) else int(cell))
-                else:
-                    processed_row.append(str(cell))
-            processed_rows.append(processed_row)
+        # Use the DataFrames parsed at upload; only older uploads are rebuilt from their rows
+        dataframes = workflow_state_manager.get_uploaded_frames(session_id)
         
-        merged_data = {
-            "headers": headers,
-            "rows": processed_rows,
-            "totalRows": total_rows,
-            "matchedRows": matched_rows,
-            "unmatchedRows": unmatched_rows,
-            "dataframe_info": {
-                "shape": merged_df.shape,
-                "columns": merged_df.columns.tolist(),
-                "numeric_columns": merged_df.select_dtypes(include=[np.number]).columns.tolist()
-            }
-        }
+        merged_df, merged_data, merge_column, common_columns = merge_dataframes(dataframes)
+        total_rows = merged_data["totalRows"]
+        matched_rows = merged_data["matchedRows"]
+        unmatched_rows = merged_data["unmatchedRows"]
         
         # Store the merged result
-        workflow_state_manager.store_merged_data(session_id, merged_data)
+        workflow_state_manager.store_merged_data(
+            session_id, merged_data, categorize_repeated_strings(merged_df), source_key=merge_key
+        )
         workflow_state_manager.add_workflow_step(session_id, "merge_session_files", {
             "files_count": len(uploaded_files),
             "file_names": [f.get('filename', 'unknown') for f in uploaded_files],
@@ -435,7 +747,7 @@ async def merge_session_files(
             "force_remerge": force_remerge
         })
         
-        return {
+        return table_response(merged_df, {
             **merged_data,
             "session_id": session_id,
             "workflow_step": "merge_session_files",
@@ -443,14 +755,315 @@ async def merge_session_files(
             "common_columns": list(common_columns),
             "message": "Successfully merged session files",
             "cached": False
-        }
+        }, accept, downcast)
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error merging session files: {str(e)}"
         )
 
+def grouped_box_figure(df: "pd.DataFrame", x_column: str, y_column: str, title: str) -> "go.Figure":
+    """
+    Box plot of y_column per x_column group drawn from precomputed quartiles.
+    The statistics come from one groupby instead of shipping every point for
+    Plotly to aggregate in the browser. Whiskers follow Plotly's 1.5 x IQR
+    rule; individual outlier points are not drawn.
+    """
+    data = df[[x_column, y_column]].dropna()
+    keys = data[x_column]
+    values = data[y_column]
+    
+    quartiles = values.groupby(keys, sort=False, observed=True).quantile([0.25, 0.5, 0.75]).unstack()
+    q1, median, q3 = quartiles[0.25], quartiles[0.5], quartiles[0.75]
+    iqr = q3 - q1
+    
+    # Whiskers end at the most extreme values still inside the fences
+    group_position = quartiles.index.get_indexer(keys)
+    inside = values.between((q1 - 1.5 * iqr).to_numpy()[group_position],
+                            (q3 + 1.5 * iqr).to_numpy()[group_position])
+    whisker_groups = values[inside].groupby(keys[inside], sort=False, observed=True)
+    lowerfence = whisker_groups.min().reindex(quartiles.index)
+    upperfence = whisker_groups.max().reindex(quartiles.index)
+    
+    fig = go.Figure(go.Box(
+        x=quartiles.index.tolist(),
+        q1=q1.to_numpy(),
+        median=median.to_numpy(),
+        q3=q3.to_numpy(),
+        lowerfence=lowerfence.to_numpy(),
+        upperfence=upperfence.to_numpy(),
+        name=y_column
+    ))
+    fig.update_layout(title=title, xaxis_title=x_column, yaxis_title=y_column)
+    return fig
+
+def box_summary_trace(series: "pd.Series", name: str) -> "go.Box":
+    """
+    Box trace of one numeric column drawn from its quartiles, like
+    grouped_box_figure, so the figure carries five numbers instead of
+    every value. Whiskers follow the 1.5 x IQR rule.
+    """
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return go.Box(y=[], name=name)
+    
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return go.Box(
+        x=[name], q1=[q1], median=[median], q3=[q3],
+        lowerfence=[inside.min()], upperfence=[inside.max()], name=name
+    )
+
+def sample_rows(df: "pd.DataFrame", max_rows: int) -> "pd.DataFrame":
+    """Random subset of at most max_rows rows, in their original order, for point plots"""
+    if max_rows <= 0 or len(df) <= max_rows:
+        return df
+    positions = np.random.default_rng(0).choice(len(df), size=max_rows, replace=False)
+    return df.iloc[np.sort(positions)]
+
+def histogram_bar(series: "pd.Series", bins: int = 20, name: Optional[str] = None) -> "go.Bar":
+    """Bar trace of a numeric column's histogram, binned here with np.histogram"""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+    return go.Bar(x=edges[:-1], y=counts, width=np.diff(edges), offset=0, name=name)
+
+def histogram_figure(df: "pd.DataFrame", column: str, title: str, bins: int = 20) -> "go.Figure":
+    """
+    Histogram of one column. Numeric columns are binned server-side, so the
+    figure carries the bin counts instead of every value; other columns are
+    left to px.histogram to count categories.
+    """
+    if not pd.api.types.is_numeric_dtype(df[column]):
+        return px.histogram(df, x=column, title=title, nbins=bins)
+    fig = go.Figure(histogram_bar(df[column], bins, name=column))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title='count', bargap=0)
+    return fig
+
+def session_correlation_matrix(session_id: str, df: "pd.DataFrame",
+                               numeric_cols: Optional["pd.Index"] = None) -> "pd.DataFrame":
+    """Correlation matrix of the session's merged data (df), computed once per merge"""
+    correlation_matrix = workflow_state_manager.get_correlation_matrix(session_id)
+    if correlation_matrix is None:
+        if numeric_cols is None:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+        correlation_matrix = compute_correlation_matrix(df[numeric_cols])
+        workflow_state_manager.store_correlation_matrix(session_id, correlation_matrix)
+    return correlation_matrix
+
+def render_plot_json(df: "pd.DataFrame", plot_type: str, matched_columns: List[str],
+                     numeric_cols: "pd.Index", is_subplot: bool,
+                     correlation_matrix: Optional["pd.DataFrame"] = None) -> str:
+    """
+    Build the Plotly figure for a visualization request and encode it as JSON.
+    Synchronous and CPU-bound, so the endpoint runs it in the threadpool.
+    A precomputed correlation_matrix is used for the heatmap when given.
+    """
+    # Column names for the default-plot lookups, hashed once
+    available_columns = set(df.columns)
+    
+    # Generate different types of plots using Plotly
+    if is_subplot and len(matched_columns) > 1 and plot_type in ["histogram", "boxplot"]:
+        # Create subplots for multiple columns
+        fig = go.Figure()
+        
+        # Select each column once and lay the traces out row by row, so all
+        # of them are added to the figure in a single add_traces call
+        subplot_columns = {col: df[col] for col in matched_columns}
+        n_cols = min(2, len(matched_columns))  # Max 2 columns for subplots
+        subplot_rows = [(i // n_cols) + 1 for i in range(len(matched_columns))]
+        subplot_cols = [(i % n_cols) + 1 for i in range(len(matched_columns))]
+        
+        if plot_type == "histogram":
+            # Create subplots for histograms
+            n_rows = (len(matched_columns) + n_cols - 1) // n_cols
+            
+            fig = make_subplots(
+                rows=n_rows, 
+                cols=n_cols,
+                subplot_titles=[f'Histogram of {col}' for col in matched_columns],
+                specs=[[{"secondary_y": False}] * n_cols] * n_rows
+            )
+            
+            traces = [
+                histogram_bar(series, name=col) if pd.api.types.is_numeric_dtype(series)
+                else go.Histogram(x=series.to_numpy(), name=col, nbinsx=20)
+                for col, series in subplot_columns.items()
+            ]
+            fig.add_traces(traces, rows=subplot_rows, cols=subplot_cols)
+            
+            fig.update_layout(
+                title=f'Histograms of {", ".join(matched_columns)}',
+                height=300 * n_rows,
+                showlegend=False,
+                bargap=0
+            )
+            
+        elif plot_type == "boxplot":
+            # Create subplots for boxplots
+            n_rows = (len(matched_columns) + n_cols - 1) // n_cols
+            
+            fig = make_subplots(
+                rows=n_rows, 
+                cols=n_cols,
+                subplot_titles=[f'Box Plot of {col}' for col in matched_columns],
+                specs=[[{"secondary_y": False}] * n_cols] * n_rows
+            )
+            
+            traces = [
+                box_summary_trace(series, col) if pd.api.types.is_numeric_dtype(series)
+                else go.Box(y=series.to_numpy(), name=col)
+                for col, series in subplot_columns.items()
+            ]
+            fig.add_traces(traces, rows=subplot_rows, cols=subplot_cols)
+            
+            fig.update_layout(
+                title=f'Box Plots of {", ".join(matched_columns)}',
+                height=300 * n_rows,
+                showlegend=False
+            )
+    
+    elif plot_type == "scatter":
+        if len(matched_columns) >= 2:
+            fig = px.scatter(df, x=matched_columns[0], y=matched_columns[1], 
+                           title=f'Scatter Plot: {matched_columns[0]} vs {matched_columns[1]}',
+                           opacity=0.6)
+        else:
+            # Default scatter plot for biological data
+            if 'Activity_Score' in available_columns and 'Stability_Index' in available_columns:
+                fig = px.scatter(df, x='Activity_Score', y='Stability_Index',
+                               title='Activity Score vs Stability Index',
+                               opacity=0.6)
+            else:
+                # Use first two numeric columns
+                if len(numeric_cols) >= 2:
+                    fig = px.scatter(df, x=numeric_cols[0], y=numeric_cols[1],
+                                   title=f'Scatter Plot: {numeric_cols[0]} vs {numeric_cols[1]}',
+                                   opacity=0.6)
+                else:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Not enough numeric columns for scatter plot"
+                    )
+    
+    elif plot_type == "histogram":
+        if matched_columns:
+            fig = histogram_figure(df, matched_columns[0],
+                                   title=f'Histogram of {matched_columns[0]}')
+        else:
+            # Default histogram for biological data
+            if 'Activity_Score' in available_columns:
+                fig = histogram_figure(df, 'Activity_Score',
+                                       title='Distribution of Activity Scores')
+            else:
+                # Use first numeric column
+                if len(numeric_cols) > 0:
+                    fig = histogram_figure(df, numeric_cols[0],
+                                           title=f'Histogram of {numeric_cols[0]}')
+                else:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="No numeric columns found for histogram"
+                    )
+    
+    elif plot_type == "correlation":
+        # Create correlation heatmap
+        numeric_df = df[numeric_cols]
+        if len(numeric_df.columns) >= 2:
+            if correlation_matrix is None:
+                correlation_matrix = compute_correlation_matrix(numeric_df)
+            fig = go.Figure(data=go.Heatmap(
+                z=correlation_matrix.values,
+                x=correlation_matrix.columns,
+                y=correlation_matrix.columns,
+                colorscale='RdBu',
+                zmid=0,
+                text=correlation_matrix.round(2).values,
+                texttemplate="%{text}",
+                textfont={"size": 10},
+                hoverongaps=False
+            ))
+            fig.update_layout(
+                title='Correlation Heatmap',
+                xaxis_title='Variables',
+                yaxis_title='Variables',
+                width=800,
+                height=600
+            )
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Not enough numeric columns for correlation (found {len(numeric_df.columns)}, need at least 2)"
+            )
+    
+    elif plot_type == "boxplot":
+        if len(matched_columns) >= 2 and pd.api.types.is_numeric_dtype(df[matched_columns[1]]):
+            fig = grouped_box_figure(df, matched_columns[0], matched_columns[1],
+                                     title=f'Box Plot: {matched_columns[1]} by {matched_columns[0]}')
+        elif len(matched_columns) >= 2:
+            fig = px.box(df, x=matched_columns[0], y=matched_columns[1],
+                       title=f'Box Plot: {matched_columns[1]} by {matched_columns[0]}')
+        elif matched_columns and pd.api.types.is_numeric_dtype(df[matched_columns[0]]):
+            fig = go.Figure(box_summary_trace(df[matched_columns[0]], matched_columns[0]))
+            fig.update_layout(title=f'Box Plot of {matched_columns[0]}', yaxis_title=matched_columns[0])
+        elif matched_columns:
+            fig = px.box(df, y=matched_columns[0],
+                       title=f'Box Plot of {matched_columns[0]}')
+        else:
+            # Default box plot for biological data
+            if 'Activity_Score' in available_columns and 'Mutation' in available_columns and pd.api.types.is_numeric_dtype(df['Activity_Score']):
+                fig = grouped_box_figure(df, 'Mutation', 'Activity_Score',
+                                         title='Activity Score Distribution by Mutation')
+            elif 'Activity_Score' in available_columns and 'Mutation' in available_columns:
+                fig = px.box(df, x='Mutation', y='Activity_Score',
+                           title='Activity Score Distribution by Mutation')
+            else:
+                # Use first numeric column
+                if len(numeric_cols) > 0:
+                    fig = go.Figure(box_summary_trace(df[numeric_cols[0]], numeric_cols[0]))
+                    fig.update_layout(title=f'Box Plot of {numeric_cols[0]}', yaxis_title=numeric_cols[0])
+                else:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="No numeric columns found for box plot"
+                    )
+    
+    else:
+        # Default to scatter plot
+        if len(numeric_cols) >= 2:
+            fig = px.scatter(df, x=numeric_cols[0], y=numeric_cols[1],
+                           title=f'Scatter Plot: {numeric_cols[0]} vs {numeric_cols[1]}',
+                           opacity=0.6)
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="Not enough numeric columns for scatter plot"
+            )
+    
+    # Convert Plotly figure to JSON
+    return figure_to_json(fig)
+
+def build_visualization(df: "pd.DataFrame", plot_type: str, matched_columns: List[str],
+                        numeric_cols: "pd.Index", is_subplot: bool,
+                        precision: str, max_points: int,
+                        correlation_matrix: Optional["pd.DataFrame"] = None) -> str:
+    """Prepare the plot data for a visualization request and render it to Plotly JSON"""
+    # Histograms, box plots and the heatmap are aggregated in float64 from the full frame
+    if plot_type in ("histogram", "boxplot", "correlation"):
+        plot_df = df
+    else:
+        # Point plots are sampled first, so only the points sent are copied; previews
+        # don't need double precision, and float32 halves the encoded plot data
+        plot_df = sample_rows(df, max_points)
+        if precision != "full":
+            plot_df = downcast_float_columns(plot_df)
+    
+    return render_plot_json(plot_df, plot_type, matched_columns, numeric_cols, is_subplot, correlation_matrix)
+
 @router.post("/generate-visualization")
 async def generate_visualization(
     file: Optional[UploadFile] = File(None),
@@ -461,12 +1074,17 @@ async def generate_visualization(
     use_session_data: bool = Form(False),
     columns: Optional[str] = Form(None),  # New parameter for multiple columns
     is_subplot: bool = Form(False),  # New parameter to indicate subplot request
+    precision: str = Form("fast"),  # "fast" (float32 plot data) or "full" (float64)
+    embed_plot: bool = Form(True),  # False returns plot_url instead of plot_json (needs session_id)
+    max_points: int = Form(20000),  # Scatter plots draw a random sample of at most this many rows
     db: Session = Depends(get_db)
 ):
     """
     Generate visualizations from CSV data.
     Can use uploaded file or data from workflow session.
     Supports intelligent column matching and subplots.
+    With embed_plot=false and a session, the figure is left out of the response
+    and served as plain JSON from /visualization-plot/{session_id}.
     """
     if not PANDAS_AVAILABLE:
         # Use simple visualizer instead of raising error
@@ -519,10 +1137,8 @@ async def generate_visualization(
         
         # Try to get data from session first if requested
         if use_session_data and session_id:
-            merged_data = workflow_state_manager.get_merged_data(session_id)
-            if merged_data:
-                # Convert stored data back to DataFrame
-                df = pd.DataFrame(merged_data['rows'], columns=merged_data['headers'])
+            df = await run_in_threadpool(workflow_state_manager.get_merged_frame, session_id)
+            if df is not None:
                 print(f"Using session data with shape: {df.shape}")
             else:
                 raise HTTPException(
@@ -531,8 +1147,7 @@ async def generate_visualization(
                 )
         elif file:
             # Use uploaded file
-            content = await file.read()
-            df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+            df = await parse_csv_upload(file)
             print(f"Using uploaded file with shape: {df.shape}")
         else:
             raise HTTPException(
@@ -540,8 +1155,15 @@ async def generate_visualization(
                 detail="Either provide a file or use session data with use_session_data=true"
             )
         
+        # Lowercased column names, prepared once for every lookup below
+        available_columns = df.columns.tolist()
+        columns_by_lower = {}
+        for col in available_columns:
+            columns_by_lower.setdefault(col.lower(), col)
+        column_lookup = [(col, col.lower(), set(col.lower())) for col in available_columns]
+        
         # Intelligent column matching function
-        def find_best_column_match(requested_column: str, available_columns: list) -> str:
+        def find_best_column_match(requested_column: str) -> str:
             """Find the best matching column using fuzzy matching"""
             if not requested_column:
                 return None
@@ -549,13 +1171,11 @@ async def generate_visualization(
             requested_lower = requested_column.lower().replace(' ', '_')
             
             # Exact match first
-            for col in available_columns:
-                if col.lower() == requested_lower:
-                    return col
+            if requested_lower in columns_by_lower:
+                return columns_by_lower[requested_lower]
             
             # Partial match
-            for col in available_columns:
-                col_lower = col.lower()
+            for col, col_lower, _ in column_lookup:
                 if requested_lower in col_lower or col_lower in requested_lower:
                     return col
             
@@ -563,10 +1183,9 @@ async def generate_visualization(
             best_match = None
             best_score = 0
             
-            for col in available_columns:
-                col_lower = col.lower()
+            for col, col_lower, col_chars in column_lookup:
                 # Simple similarity score
-                common_chars = sum(1 for c in requested_lower if c in col_lower)
+                common_chars = sum(1 for c in requested_lower if c in col_chars)
                 score = common_chars / max(len(requested_lower), len(col_lower))
                 
                 if score > best_score and score > 0.3:  # Minimum threshold
@@ -585,19 +1204,18 @@ async def generate_visualization(
                 requested_columns = [col.strip() for col in columns.split(',') if col.strip()]
         
         # Match requested columns to actual columns
-        available_columns = df.columns.tolist()
         matched_columns = []
         
         if requested_columns:
             for col in requested_columns:
-                matched_col = find_best_column_match(col, available_columns)
+                matched_col = find_best_column_match(col)
                 if matched_col:
                     matched_columns.append(matched_col)
                     print(f"Column matching: requested '{col}' -> matched '{matched_col}'")
         else:
             # Fallback to x_column and y_column
-            matched_x_column = find_best_column_match(x_column, available_columns) if x_column else None
-            matched_y_column = find_best_column_match(y_column, available_columns) if y_column else None
+            matched_x_column = find_best_column_match(x_column) if x_column else None
+            matched_y_column = find_best_column_match(y_column) if y_column else None
             if matched_x_column:
                 matched_columns.append(matched_x_column)
             if matched_y_column:
@@ -605,189 +1223,23 @@ async def generate_visualization(
             print(f"Column matching: requested x='{x_column}' -> matched '{matched_x_column}'")
             print(f"Column matching: requested y='{y_column}' -> matched '{matched_y_column}'")
         
-        # Generate different types of plots using Plotly
-        if is_subplot and len(matched_columns) > 1 and plot_type in ["histogram", "boxplot"]:
-            # Create subplots for multiple columns
-            fig = go.Figure()
-            
-            if plot_type == "histogram":
-                # Create subplots for histograms
-                from plotly.subplots import make_subplots
-                
-                n_cols = min(2, len(matched_columns))  # Max 2 columns for subplots
-                n_rows = (len(matched_columns) + n_cols - 1) // n_cols
-                
-                fig = make_subplots(
-                    rows=n_rows, 
-                    cols=n_cols,
-                    subplot_titles=[f'Histogram of {col}' for col in matched_columns],
-                    specs=[[{"secondary_y": False}] * n_cols] * n_rows
-                )
-                
-                for i, col in enumerate(matched_columns):
-                    row = (i // n_cols) + 1
-                    col_idx = (i % n_cols) + 1
-                    
-                    fig.add_trace(
-                        go.Histogram(x=df[col], name=col, nbinsx=20),
-                        row=row, col=col_idx
-                    )
-                
-                fig.update_layout(
-                    title=f'Histograms of {", ".join(matched_columns)}',
-                    height=300 * n_rows,
-                    showlegend=False
-                )
-                
-            elif plot_type == "boxplot":
-                # Create subplots for boxplots
-                from plotly.subplots import make_subplots
-                
-                n_cols = min(2, len(matched_columns))
-                n_rows = (len(matched_columns) + n_cols - 1) // n_cols
-                
-                fig = make_subplots(
-                    rows=n_rows, 
-                    cols=n_cols,
-                    subplot_titles=[f'Box Plot of {col}' for col in matched_columns],
-                    specs=[[{"secondary_y": False}] * n_cols] * n_rows
-                )
-                
-                for i, col in enumerate(matched_columns):
-                    row = (i // n_cols) + 1
-                    col_idx = (i % n_cols) + 1
-                    
-                    fig.add_trace(
-                        go.Box(y=df[col], name=col),
-                        row=row, col=col_idx
-                    )
-                
-                fig.update_layout(
-                    title=f'Box Plots of {", ".join(matched_columns)}',
-                    height=300 * n_rows,
-                    showlegend=False
-                )
-        
-        elif plot_type == "scatter":
-            if len(matched_columns) >= 2:
-                fig = px.scatter(df, x=matched_columns[0], y=matched_columns[1], 
-                               title=f'Scatter Plot: {matched_columns[0]} vs {matched_columns[1]}',
-                               opacity=0.6)
-            else:
-                # Default scatter plot for biological data
-                if 'Activity_Score' in df.columns and 'Stability_Index' in df.columns:
-                    fig = px.scatter(df, x='Activity_Score', y='Stability_Index',
-                                   title='Activity Score vs Stability Index',
-                                   opacity=0.6)
-                else:
-                    # Use first two numeric columns
-                    numeric_cols = df.select_dtypes(include=[np.number]).columns
-                    if len(numeric_cols) >= 2:
-                        fig = px.scatter(df, x=numeric_cols[0], y=numeric_cols[1],
-                                       title=f'Scatter Plot: {numeric_cols[0]} vs {numeric_cols[1]}',
-                                       opacity=0.6)
-                    else:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="Not enough numeric columns for scatter plot"
-                        )
-        
-        elif plot_type == "histogram":
-            if matched_columns:
-                fig = px.histogram(df, x=matched_columns[0], 
-                                 title=f'Histogram of {matched_columns[0]}',
-                                 nbins=20)
-            else:
-                # Default histogram for biological data
-                if 'Activity_Score' in df.columns:
-                    fig = px.histogram(df, x='Activity_Score',
-                                     title='Distribution of Activity Scores',
-                                     nbins=20)
-                else:
-                    # Use first numeric column
-                    numeric_cols = df.select_dtypes(include=[np.number]).columns
-                    if len(numeric_cols) > 0:
-                        fig = px.histogram(df, x=numeric_cols[0],
-                                         title=f'Histogram of {numeric_cols[0]}',
-                                         nbins=20)
-                    else:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="No numeric columns found for histogram"
-                        )
-        
-        elif plot_type == "correlation":
-            # Create correlation heatmap
-            numeric_df = df.select_dtypes(include=[np.number])
-            if len(numeric_df.columns) >= 2:
-                correlation_matrix = numeric_df.corr()
-                fig = go.Figure(data=go.Heatmap(
-                    z=correlation_matrix.values,
-                    x=correlation_matrix.columns,
-                    y=correlation_matrix.columns,
-                    colorscale='RdBu',
-                    zmid=0,
-                    text=correlation_matrix.round(2).values,
-                    texttemplate="%{text}",
-                    textfont={"size": 10},
-                    hoverongaps=False
-                ))
-                fig.update_layout(
-                    title='Correlation Heatmap',
-                    xaxis_title='Variables',
-                    yaxis_title='Variables',
-                    width=800,
-                    height=600
-                )
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Not enough numeric columns for correlation (found {len(numeric_df.columns)}, need at least 2)"
-                )
-        
-        elif plot_type == "boxplot":
-            if len(matched_columns) >= 2:
-                fig = px.box(df, x=matched_columns[0], y=matched_columns[1],
-                           title=f'Box Plot: {matched_columns[1]} by {matched_columns[0]}')
-            elif matched_columns:
-                fig = px.box(df, y=matched_columns[0],
-                           title=f'Box Plot of {matched_columns[0]}')
-            else:
-                # Default box plot for biological data
-                if 'Activity_Score' in df.columns and 'Mutation' in df.columns:
-                    fig = px.box(df, x='Mutation', y='Activity_Score',
-                               title='Activity Score Distribution by Mutation')
-                else:
-                    # Use first numeric column
-                    numeric_cols = df.select_dtypes(include=[np.number]).columns
-                    if len(numeric_cols) > 0:
-                        fig = px.box(df, y=numeric_cols[0],
-                                   title=f'Box Plot of {numeric_cols[0]}')
-                    else:
-                        raise HTTPException(
-                            status_code=400,
-                            detail="No numeric columns found for box plot"
-                        )
+        # Numeric columns are used by several plot defaults and the response; find them once
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
         
-        else:
-            # Default to scatter plot
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) >= 2:
-                fig = px.scatter(df, x=numeric_cols[0], y=numeric_cols[1],
-                               title=f'Scatter Plot: {numeric_cols[0]} vs {numeric_cols[1]}',
-                               opacity=0.6)
-            else:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Not enough numeric columns for scatter plot"
-                )
+        # The session's correlation matrix is computed once per merge and reused
+        correlation_matrix = None
+        if plot_type == "correlation" and use_session_data and session_id and len(numeric_cols) >= 2:
+            correlation_matrix = await run_in_threadpool(session_correlation_matrix, session_id, df, numeric_cols)
         
-        # Convert Plotly figure to JSON
-        plot_json = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+        # Preparing, building and encoding the figure is CPU-bound; run it off the event loop
+        plot_json = await run_in_threadpool(
+            build_visualization, df, plot_type, matched_columns, numeric_cols, is_subplot,
+            precision, max_points, correlation_matrix
+        )
         
         # Get column information
         columns = df.columns.tolist()
-        numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        numeric_columns = numeric_cols.tolist()
         
         viz_data = {
             "plot_type": plot_type,
@@ -831,6 +1283,12 @@ async def generate_visualization(
                     viz_data=viz_data,
                     parent_data_id=parent_data_id
                 )
+            
+            if not embed_plot:
+                # Point at the stored figure instead of escaping it into this response
+                response_data = {k: v for k, v in viz_data.items() if k != "plot_json"}
+                response_data["plot_url"] = f"/api/bio/visualization-plot/{session_id}"
+                return response_data
         
         return viz_data
         
@@ -840,6 +1298,21 @@ async def generate_visualization(
             detail=f"Error generating visualization: {str(e)}"
         )
 
+@router.get("/visualization-plot/{session_id}")
+async def get_visualization_plot(session_id: str):
+    """
+    Return the last generated Plotly figure of a session as a JSON document,
+    without the string escaping it needs when embedded in plot_json.
+    """
+    viz_data = workflow_state_manager.get_visualization_data(session_id)
+    if not viz_data or "plot_json" not in viz_data:
+        raise HTTPException(
+            status_code=404,
+            detail="No visualization found in session. Please generate a visualization first."
+        )
+    
+    return Response(content=viz_data["plot_json"], media_type="application/json")
+
 @router.post("/explain-visualization")
 async def explain_visualization(
     session_id: str = Form(...),
@@ -859,29 +1332,29 @@ async def explain_visualization(
     
     try:
         # Get the data from session
-        merged_data = workflow_state_manager.get_merged_data(session_id)
-        if not merged_data:
+        df = workflow_state_manager.get_merged_frame(session_id)
+        if df is None:
             raise HTTPException(
                 status_code=400,
                 detail="No data found in session. Please upload or merge data first."
             )
         
-        # Convert stored data back to DataFrame
-        df = pd.DataFrame(merged_data['rows'], columns=merged_data['headers'])
-        
-        # Perform statistical analysis based on plot type
+        # Perform statistical analysis based on plot type, sharing one numeric column lookup
         analysis = {}
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
         
         if plot_type == "scatter":
-            analysis = analyze_scatter_plot(df, x_column, y_column)
+            analysis = analyze_scatter_plot(df, x_column, y_column, numeric_cols)
         elif plot_type == "correlation":
-            analysis = analyze_correlation_matrix(df)
+            analysis = analyze_correlation_matrix(
+                df, session_correlation_matrix(session_id, df, numeric_cols), numeric_cols
+            )
         elif plot_type == "histogram":
-            analysis = analyze_histogram(df, x_column)
+            analysis = analyze_histogram(df, x_column, numeric_cols)
         elif plot_type == "boxplot":
             analysis = analyze_boxplot(df, x_column, y_column)
         else:
-            analysis = analyze_general_trends(df)
+            analysis = analyze_general_trends(df, numeric_cols)
         
         return {
             "plot_type": plot_type,
@@ -896,7 +1369,71 @@ async def explain_visualization(
             detail=f"Error explaining visualization: {str(e)}"
         )
 
-def analyze_scatter_plot(df, x_column, y_column):
+# Correlation strength labels indexed by _correlation_buckets()
+_CORRELATION_STRENGTHS = np.array(["weak", "moderate", "strong"]) if PANDAS_AVAILABLE else None
+
+def _correlation_buckets(abs_corr):
+    """Strength bucket of |r| values without per-value branching: 0 weak, 1 moderate (> 0.3), 2 strong (> 0.7)"""
+    return (abs_corr > 0.3).astype(np.int8) + (abs_corr > 0.7).astype(np.int8)
+
+def _column_values(df, column):
+    """Non-missing values of a column as a float64 array, extracted once per column"""
+    values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[~np.isnan(values)]
+
+def _column_moments_numpy(values, lower, upper):
+    """Mean, sample std, min, max and count outside [lower, upper] of a non-empty array"""
+    std = np.std(values, ddof=1) if values.size > 1 else np.nan
+    outliers = np.count_nonzero((values < lower) | (values > upper))
+    return np.mean(values), std, np.min(values), np.max(values), outliers
+
+def _column_moments_loop(values, lower, upper):
+    """The same statistics in one pass over the values, written for Numba to compile"""
+    mean = 0.0
+    m2 = 0.0
+    minimum = values[0]
+    maximum = values[0]
+    outliers = 0
+    for i in range(values.size):
+        value = values[i]
+        # Welford's update keeps the running variance stable
+        delta = value - mean
+        mean += delta / (i + 1)
+        m2 += delta * (value - mean)
+        if value < minimum:
+            minimum = value
+        if value > maximum:
+            maximum = value
+        if value < lower or value > upper:
+            outliers += 1
+    std = np.sqrt(m2 / (values.size - 1)) if values.size > 1 else np.nan
+    return mean, std, minimum, maximum, outliers
+
+# The loop is only faster than NumPy's separate passes once compiled
+_column_moments = njit(cache=True)(_column_moments_loop) if NUMBA_AVAILABLE else _column_moments_numpy
+
+def _summarize_values(values):
+    """Summary statistics and IQR outlier count of a NaN-free array"""
+    if values.size == 0:
+        return {"mean": np.nan, "median": np.nan, "std": np.nan, "min": np.nan,
+                "max": np.nan, "q1": np.nan, "q3": np.nan, "outliers": 0}
+    
+    # Quartiles and median from one partition of the values
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    mean, std, minimum, maximum, outliers = _column_moments(values, q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+    return {
+        "mean": float(mean),
+        "median": float(median),
+        "std": float(std),
+        "min": float(minimum),
+        "max": float(maximum),
+        "q1": float(q1),
+        "q3": float(q3),
+        "outliers": int(outliers)
+    }
+
+def analyze_scatter_plot(df, x_column, y_column, numeric_cols=None):
     """Analyze scatter plot trends and patterns"""
     analysis = {
         "trends": [],
@@ -907,7 +1444,8 @@ def analyze_scatter_plot(df, x_column, y_column):
     
     # Auto-detect columns if not specified
     if not x_column or not y_column:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        if numeric_cols is None:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) >= 2:
             x_column = numeric_cols[0]
             y_column = numeric_cols[1]
@@ -917,12 +1455,23 @@ def analyze_scatter_plot(df, x_column, y_column):
     if x_column not in df.columns or y_column not in df.columns:
         return {"error": f"Columns {x_column} and {y_column} not found in data"}
     
-    # Calculate correlation
-    correlation = df[x_column].corr(df[y_column])
+    # Each column is read into a float64 array once, for the correlation and the summaries
+    x_values = df[x_column].to_numpy(dtype=np.float64, na_value=np.nan)
+    y_values = df[y_column].to_numpy(dtype=np.float64, na_value=np.nan)
+    x_present = ~np.isnan(x_values)
+    y_present = ~np.isnan(y_values)
+    
+    # Calculate correlation over the rows where both values are present
+    both_present = x_present & y_present
+    if np.count_nonzero(both_present) < 2:
+        correlation = np.nan
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = float(np.corrcoef(x_values[both_present], y_values[both_present])[0, 1])
     analysis["correlations"].append({
         "columns": [x_column, y_column],
         "correlation": correlation,
-        "strength": "strong" if abs(correlation) > 0.7 else "moderate" if abs(correlation) > 0.3 else "weak"
+        "strength": str(_CORRELATION_STRENGTHS[_correlation_buckets(np.abs(correlation))])
     })
     
     # Detect trends
@@ -935,35 +1484,27 @@ def analyze_scatter_plot(df, x_column, y_column):
     else:
         analysis["trends"].append(f"Moderate relationship between {x_column} and {y_column}")
     
-    # Detect outliers using IQR method
-    Q1_x, Q3_x = df[x_column].quantile([0.25, 0.75])
-    Q1_y, Q3_y = df[y_column].quantile([0.25, 0.75])
-    IQR_x = Q3_x - Q1_x
-    IQR_y = Q3_y - Q1_y
-    
-    outliers_x = df[(df[x_column] < Q1_x - 1.5 * IQR_x) | (df[x_column] > Q3_x + 1.5 * IQR_x)]
-    outliers_y = df[(df[y_column] < Q1_y - 1.5 * IQR_y) | (df[y_column] > Q3_y + 1.5 * IQR_y)]
+    # Summary statistics, with outliers detected using IQR method
+    x_stats = _summarize_values(x_values[x_present])
+    y_stats = _summarize_values(y_values[y_present])
     
-    if len(outliers_x) > 0:
-        analysis["outliers"].append(f"{len(outliers_x)} outliers detected in {x_column}")
-    if len(outliers_y) > 0:
-        analysis["outliers"].append(f"{len(outliers_y)} outliers detected in {y_column}")
+    if x_stats["outliers"] > 0:
+        analysis["outliers"].append(f"{x_stats['outliers']} outliers detected in {x_column}")
+    if y_stats["outliers"] > 0:
+        analysis["outliers"].append(f"{y_stats['outliers']} outliers detected in {y_column}")
     
     # Generate insights
-    x_mean, y_mean = df[x_column].mean(), df[y_column].mean()
-    x_std, y_std = df[x_column].std(), df[y_column].std()
-    
     analysis["insights"].extend([
-        f"Mean {x_column}: {x_mean:.2f} (std: {x_std:.2f})",
-        f"Mean {y_column}: {y_mean:.2f} (std: {y_std:.2f})",
-        f"Data range: {df[x_column].min():.2f} to {df[x_column].max():.2f} for {x_column}",
-        f"Data range: {df[y_column].min():.2f} to {df[y_column].max():.2f} for {y_column}"
+        f"Mean {x_column}: {x_stats['mean']:.2f} (std: {x_stats['std']:.2f})",
+        f"Mean {y_column}: {y_stats['mean']:.2f} (std: {y_stats['std']:.2f})",
+        f"Data range: {x_stats['min']:.2f} to {x_stats['max']:.2f} for {x_column}",
+        f"Data range: {y_stats['min']:.2f} to {y_stats['max']:.2f} for {y_column}"
     ])
     
     return analysis
 
-def analyze_correlation_matrix(df):
-    """Analyze correlation matrix patterns"""
+def analyze_correlation_matrix(df, correlation_matrix=None, numeric_cols=None):
+    """Analyze correlation matrix patterns, reusing correlation_matrix when given"""
     analysis = {
         "strong_correlations": [],
         "moderate_correlations": [],
@@ -971,42 +1512,47 @@ def analyze_correlation_matrix(df):
         "insights": []
     }
     
-    numeric_df = df.select_dtypes(include=[np.number])
-    if len(numeric_df.columns) < 2:
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) < 2:
         return {"error": "Not enough numeric columns for correlation analysis"}
     
-    correlation_matrix = numeric_df.corr()
+    if correlation_matrix is None:
+        correlation_matrix = compute_correlation_matrix(df[numeric_cols])
     
-    # Find strong correlations (|r| > 0.7)
-    strong_pairs = []
-    moderate_pairs = []
-    weak_pairs = []
+    # Classify every column pair (upper triangle) into strong/moderate/weak at once
+    columns = correlation_matrix.columns.to_numpy()
+    matrix = correlation_matrix.to_numpy()
+    rows, cols = np.triu_indices_from(matrix, k=1)
+    pair_corrs = matrix[rows, cols]
+    abs_corrs = np.abs(pair_corrs)
+    buckets = _correlation_buckets(abs_corrs)
+    weak_count, moderate_count, strong_count = np.bincount(buckets, minlength=3)
     
-    for i in range(len(correlation_matrix.columns)):
-        for j in range(i+1, len(correlation_matrix.columns)):
-            col1 = correlation_matrix.columns[i]
-            col2 = correlation_matrix.columns[j]
-            corr = correlation_matrix.iloc[i, j]
-            
-            if abs(corr) > 0.7:
-                strong_pairs.append((col1, col2, corr))
-            elif abs(corr) > 0.3:
-                moderate_pairs.append((col1, col2, corr))
-            else:
-                weak_pairs.append((col1, col2, corr))
+    def describe_pairs(bucket, top_k=5):
+        """Format the top_k strongest pairs of a strength bucket, strongest first"""
+        in_bucket = np.flatnonzero(buckets == bucket)
+        if len(in_bucket) > top_k:
+            # Select the strongest without sorting the whole bucket
+            in_bucket = in_bucket[np.argpartition(-abs_corrs[in_bucket], top_k)[:top_k]]
+        in_bucket = in_bucket[np.argsort(-abs_corrs[in_bucket], kind="stable")]
+        return [
+            f"{columns[rows[k]]} ↔ {columns[cols[k]]} (r={pair_corrs[k]:.3f})"
+            for k in in_bucket
+        ]
     
-    analysis["strong_correlations"] = [f"{col1} ↔ {col2} (r={corr:.3f})" for col1, col2, corr in strong_pairs[:5]]
-    analysis["moderate_correlations"] = [f"{col1} ↔ {col2} (r={corr:.3f})" for col1, col2, corr in moderate_pairs[:5]]
+    analysis["strong_correlations"] = describe_pairs(2)
+    analysis["moderate_correlations"] = describe_pairs(1)
     
     analysis["insights"].extend([
-        f"Found {len(strong_pairs)} strong correlations (|r| > 0.7)",
-        f"Found {len(moderate_pairs)} moderate correlations (0.3 < |r| < 0.7)",
-        f"Found {len(weak_pairs)} weak correlations (|r| < 0.3)"
+        f"Found {strong_count} strong correlations (|r| > 0.7)",
+        f"Found {moderate_count} moderate correlations (0.3 < |r| < 0.7)",
+        f"Found {weak_count} weak correlations (|r| < 0.3)"
     ])
     
     return analysis
 
-def analyze_histogram(df, x_column):
+def analyze_histogram(df, x_column, numeric_cols=None):
     """Analyze histogram distribution patterns"""
     try:
         analysis = {
@@ -1018,7 +1564,8 @@ def analyze_histogram(df, x_column):
         }
         
         if not x_column:
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
+            if numeric_cols is None:
+                numeric_cols = df.select_dtypes(include=[np.number]).columns
             if len(numeric_cols) > 0:
                 x_column = numeric_cols[0]
             else:
@@ -1028,11 +1575,12 @@ def analyze_histogram(df, x_column):
             return {"error": f"Column {x_column} not found in data"}
         
         # Basic statistics
-        mean_val = float(df[x_column].mean())
-        median_val = float(df[x_column].median())
-        std_val = float(df[x_column].std())
-        min_val = float(df[x_column].min())
-        max_val = float(df[x_column].max())
+        stats = _summarize_values(_column_values(df, x_column))
+        mean_val = stats["mean"]
+        median_val = stats["median"]
+        std_val = stats["std"]
+        min_val = stats["min"]
+        max_val = stats["max"]
         
         analysis["central_tendency"] = {
             "mean": mean_val,
@@ -1043,7 +1591,7 @@ def analyze_histogram(df, x_column):
         analysis["spread"] = {
             "std": std_val,
             "range": max_val - min_val,
-            "iqr": float(df[x_column].quantile(0.75) - df[x_column].quantile(0.25))
+            "iqr": stats["q3"] - stats["q1"]
         }
         
         # Simple distribution analysis
@@ -1054,14 +1602,9 @@ def analyze_histogram(df, x_column):
         else:
             analysis["distribution"] = "approximately symmetric"
         
-        # Detect outliers using IQR method
-        Q1 = float(df[x_column].quantile(0.25))
-        Q3 = float(df[x_column].quantile(0.75))
-        IQR = Q3 - Q1
-        outliers = df[(df[x_column] < Q1 - 1.5 * IQR) | (df[x_column] > Q3 + 1.5 * IQR)]
-        
-        if len(outliers) > 0:
-            analysis["outliers"].append(f"{len(outliers)} outliers detected ({len(outliers)/len(df)*100:.1f}% of data)")
+        # Outliers detected using IQR method
+        if stats["outliers"] > 0:
+            analysis["outliers"].append(f"{stats['outliers']} outliers detected ({stats['outliers']/len(df)*100:.1f}% of data)")
         
         analysis["insights"].extend([
             f"Distribution is {analysis['distribution']}",
@@ -1088,42 +1631,40 @@ def analyze_boxplot(df, x_column, y_column):
     if x_column not in df.columns or y_column not in df.columns:
         return {"error": f"Columns {x_column} and {y_column} not found in data"}
     
-    # Analyze group differences
-    groups = df[x_column].unique()
-    group_stats = {}
-    
-    for group in groups:
-        group_data = df[df[x_column] == group][y_column]
-        group_stats[group] = {
-            "mean": group_data.mean(),
-            "median": group_data.median(),
-            "std": group_data.std(),
-            "count": len(group_data)
-        }
+    # Analyze group differences with one groupby over all groups
+    x_series = df[x_column]
+    groups = x_series.unique()
+    y_values = pd.Series(df[y_column].to_numpy(dtype=np.float64, na_value=np.nan), index=df.index)
+    grouped = y_values.groupby(x_series, sort=False, observed=True)
     
     # Find groups with highest/lowest means
-    sorted_groups = sorted(group_stats.items(), key=lambda x: x[1]["mean"], reverse=True)
+    group_means = grouped.mean().dropna()
     
-    if len(sorted_groups) > 1:
-        highest_group = sorted_groups[0]
-        lowest_group = sorted_groups[-1]
-        mean_diff = highest_group[1]["mean"] - lowest_group[1]["mean"]
+    if len(group_means) > 1:
+        highest_group = group_means.idxmax()
+        lowest_group = group_means.idxmin()
+        mean_diff = group_means[highest_group] - group_means[lowest_group]
         
         analysis["group_comparisons"].extend([
-            f"Highest mean: {highest_group[0]} ({highest_group[1]['mean']:.2f})",
-            f"Lowest mean: {lowest_group[0]} ({lowest_group[1]['mean']:.2f})",
+            f"Highest mean: {highest_group} ({group_means[highest_group]:.2f})",
+            f"Lowest mean: {lowest_group} ({group_means[lowest_group]:.2f})",
             f"Difference: {mean_diff:.2f}"
         ])
     
-    # Detect outliers in each group
-    for group in groups:
-        group_data = df[df[x_column] == group][y_column]
-        Q1, Q3 = group_data.quantile([0.25, 0.75])
-        IQR = Q3 - Q1
-        outliers = group_data[(group_data < Q1 - 1.5 * IQR) | (group_data > Q3 + 1.5 * IQR)]
-        
-        if len(outliers) > 0:
-            analysis["outliers"].append(f"Group '{group}': {len(outliers)} outliers")
+    # Outliers in each group, detected using IQR method: every row is compared
+    # with its own group's fences (rows without a group index the trailing NaN)
+    quartiles = grouped.quantile([0.25, 0.75]).unstack()
+    iqr = quartiles[0.75] - quartiles[0.25]
+    group_position = quartiles.index.get_indexer(x_series)
+    lower = np.append((quartiles[0.25] - 1.5 * iqr).to_numpy(), np.nan)[group_position]
+    upper = np.append((quartiles[0.75] + 1.5 * iqr).to_numpy(), np.nan)[group_position]
+    values = y_values.to_numpy()
+    is_outlier = (values < lower) | (values > upper)
+    outlier_counts = np.bincount(group_position[is_outlier], minlength=len(quartiles))
+    
+    for group, outliers in zip(quartiles.index, outlier_counts):
+        if outliers > 0:
+            analysis["outliers"].append(f"Group '{group}': {outliers} outliers")
     
     analysis["insights"].extend([
         f"Comparing {len(groups)} groups across {y_column}",
@@ -1132,7 +1673,7 @@ def analyze_boxplot(df, x_column, y_column):
     
     return analysis
 
-def analyze_general_trends(df):
+def analyze_general_trends(df, numeric_cols=None):
     """Analyze general data trends and patterns"""
     analysis = {
         "summary_stats": {},
@@ -1142,16 +1683,19 @@ def analyze_general_trends(df):
     }
     
     # Summary statistics
-    numeric_df = df.select_dtypes(include=[np.number])
-    if len(numeric_df.columns) > 0:
+    if numeric_cols is None:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+    missing_values = int(df.isna().to_numpy().sum())
+    total_cells = df.shape[0] * df.shape[1]
+    if len(numeric_cols) > 0:
         analysis["summary_stats"] = {
-            "numeric_columns": len(numeric_df.columns),
+            "numeric_columns": len(numeric_cols),
             "total_rows": len(df),
-            "missing_values": df.isnull().sum().sum()
+            "missing_values": missing_values
         }
     
     # Data quality check
-    missing_pct = df.isnull().sum().sum() / (len(df) * len(df.columns)) * 100
+    missing_pct = missing_values / total_cells * 100 if total_cells else 0.0
     analysis["data_quality"]["missing_data_pct"] = missing_pct
     
     if missing_pct > 10:
@@ -1161,29 +1705,43 @@ def analyze_general_trends(df):
     else:
         analysis["trends"].append("Good data quality - low missing data rate")
     
-    # Column type analysis
-    categorical_cols = df.select_dtypes(include=['object']).columns
+    # Column type analysis: every column that isn't numeric counts as categorical
+    categorical_count = len(df.columns) - len(numeric_cols)
     analysis["insights"].extend([
-        f"Dataset has {len(df.columns)} columns ({len(numeric_df.columns)} numeric, {len(categorical_cols)} categorical)",
+        f"Dataset has {len(df.columns)} columns ({len(numeric_cols)} numeric, {categorical_count} categorical)",
         f"Data spans {len(df)} observations"
     ])
     
     return analysis
 
 @router.get("/workflow-status/{session_id}")
-async def get_workflow_status(session_id: str):
+async def get_workflow_status(
+    session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get the current status and history of a workflow session"""
     session = workflow_state_manager.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or expired")
     
+    # Steps are only ever appended, so the status changes with the step count
+    # and the two data flags; last_updated alone moves on every read
+    has_merged_data = 'merged_data' in session['data']
+    has_visualization_data = 'visualization_data' in session['data']
+    etag = state_etag(session_id, session['created_at'].isoformat(), len(session['steps']),
+                      has_merged_data, has_visualization_data)
+    not_modified = revalidate(etag, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
     return {
         "session_id": session_id,
         "created_at": session['created_at'].isoformat(),
         "last_updated": session['last_updated'].isoformat(),
         "steps": session['steps'],
-        "has_merged_data": 'merged_data' in session['data'],
-        "has_visualization_data": 'visualization_data' in session['data']
+        "has_merged_data": has_merged_data,
+        "has_visualization_data": has_visualization_data
     }
 
 @router.get("/workflow-history/{session_id}")
@@ -1199,8 +1757,19 @@ async def get_workflow_history(session_id: str):
     }
 
 @router.get("/data-context/{session_id}")
-async def get_data_context(session_id: str):
+async def get_data_context(
+    session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None)
+):
     """Get the data context summary for a session"""
+    # Contexts are added and cleared but never edited, so their ids and times identify the summary
+    contexts = data_context_manager.get_session_context(session_id)
+    etag = state_etag(session_id, *(f"{data_id}@{context.created_at.isoformat()}" for data_id, context in contexts.items()))
+    not_modified = revalidate(etag, if_none_match, response)
+    if not_modified:
+        return not_modified
+    
     summary = data_context_manager.get_session_summary(session_id)
     return summary
 
@@ -1228,7 +1797,7 @@ async def get_detailed_data_context(session_id: str):
         "contexts": detailed_contexts
     }
 
-@router.post("/upload-test-results")
+@router.post("/upload-test-results", openapi_extra=ARROW_UPLOAD_OPENAPI)
 async def upload_test_results(
     file: UploadFile = File(...),
     test_type: str = Form("activity"),
@@ -1237,7 +1806,7 @@ async def upload_test_results(
     db: Session = Depends(get_db)
 ):
     """
-    Upload test results CSV file and process it.
+    Upload test results CSV file (or Arrow IPC stream) and process it.
     """
     if not PANDAS_AVAILABLE:
         raise HTTPException(
@@ -1247,8 +1816,7 @@ async def upload_test_results(
     
     try:
         # Read the uploaded file
-        content = await file.read()
-        df = pd.read_csv(io.StringIO(content.decode('utf-8')))
+        df = read_uploaded_table(file.file, file.content_type)
         
         # Basic validation
         if len(df) == 0:
@@ -1274,43 +1842,18 @@ async def upload_test_results(
             detail=f"Error processing test results: {str(e)}"
         )
 
-@router.get("/designs")
-async def get_designs(db: Session = Depends(get_db)):
-    """
-    Get all biological designs.
-    """
-    # This would typically query the database
-    # For now, return empty list
-    return []
-
-@router.get("/builds")
-async def get_builds(db: Session = Depends(get_db)):
-    """
-    Get all biological builds.
-    """
-    # This would typically query the database
-    # For now, return empty list
-    return []
-
-@router.get("/tests")
-async def get_tests(db: Session = Depends(get_db)):
-    """
-    Get all biological tests.
-    """
-    # This would typically query the database
-    # For now, return empty list
-    return []
 
-
-@router.post("/analyze-data")
+@router.post("/analyze-data", openapi_extra=ARROW_UPLOAD_OPENAPI)
 async def analyze_data(
     session_id: str = Form(...),
     use_session_data: bool = Form(True),
     file: Optional[UploadFile] = File(None),
+    precision: str = Form("fast"),  # "fast" (float32 statistics) or "full" (float64)
     db: Session = Depends(get_db)
 ):
     """
-    Comprehensive data analysis with insights and recommendations
+    Comprehensive data analysis with insights and recommendations.
+    Uploaded files may be CSV or an Arrow IPC stream.
     """
     if not PANDAS_AVAILABLE:
         raise HTTPException(
@@ -1319,9 +1862,6 @@ async def analyze_data(
         )
     
     try:
-        # Initialize analyzer
-        analyzer = DataAnalyzer()
-        
         # Get data for analysis
         if use_session_data and session_id:
             # Use session data (merged data)
@@ -1329,17 +1869,29 @@ async def analyze_data(
             if not session_data:
                 raise HTTPException(status_code=404, detail="No session data found")
             
-            df = pd.read_csv(io.StringIO(session_data))
-            print(f"Analyzing session data with shape: {df.shape}")
+            raw_data = session_data.encode('utf-8')
+            content_type = "text/csv"
         elif file:
-            # Use uploaded file
-            df = pd.read_csv(file.file)
-            print(f"Analyzing uploaded file with shape: {df.shape}")
+            # Use the spooled upload directly; it is hashed and parsed without a full read into memory
+            raw_data = file.file
+            content_type = file.content_type
         else:
             raise HTTPException(status_code=400, detail="No data provided")
         
-        # Perform comprehensive analysis
-        analysis_result = analyzer.analyze_dataset(df, session_id)
+        # Reuse the previous analysis if this exact data was already analyzed
+        data_hash = data_analyzer.compute_data_hash(raw_data, precision)
+        analysis_result = data_analyzer.get_cached_analysis(data_hash, session_id)
+        schema = data_analyzer.get_cached_schema(data_hash)
+        
+        if analysis_result is None:
+            df = read_uploaded_table(raw_data, content_type)
+            schema = DataFrameSchema.from_dataframe(df)
+            logger.debug("Analyzing data with shape: %s", schema.shape)
+            
+            # Perform comprehensive analysis
+            analysis_result = data_analyzer.analyze_dataset(
+                df, session_id, data_hash=data_hash, precision=precision, schema=schema
+            )
         
         # Track analysis in data context
         if session_id:
@@ -1347,8 +1899,7 @@ async def analyze_data(
                 session_id=session_id,
                 analysis_type="comprehensive",
                 analysis_data=analysis_result,
-                columns=list(df.columns),
-                data_shape=list(df.shape)
+                schema=schema
             )
         
         return analysis_result
@@ -1376,8 +1927,8 @@ async def query_data(
     
     try:
         # Get data from session - try merged data first, then uploaded files
-        merged_data = workflow_state_manager.get_merged_data(session_id)
-        if not merged_data:
+        df = workflow_state_manager.get_merged_frame(session_id)
+        if df is None:
             # Try to get uploaded files data
             uploaded_files = workflow_state_manager.get_uploaded_files(session_id)
             if not uploaded_files or len(uploaded_files) == 0:
@@ -1387,17 +1938,11 @@ async def query_data(
                 )
             
             # Use the first uploaded file for querying
-            first_file = uploaded_files[0]
-            merged_data = {
-                'headers': first_file['headers'],
-                'rows': first_file['rows']
-            }
-            print(f"Using uploaded file data with shape: {len(merged_data['rows'])} rows, {len(merged_data['headers'])} columns")
+            df = workflow_state_manager.get_uploaded_frames(session_id)[0]
+            print(f"Using uploaded file data with shape: {df.shape}")
         else:
-            print(f"Using merged data with shape: {len(merged_data['rows'])} rows, {len(merged_data['headers'])} columns")
+            print(f"Using merged data with shape: {df.shape}")
         
-        # Convert stored data back to DataFrame
-        df = pd.DataFrame(merged_data['rows'], columns=merged_data['headers'])
         print(f"Querying data with shape: {df.shape}")
         
         # Parse the query and apply filters
@@ -1412,7 +1957,7 @@ async def query_data(
         }
         
         # Store filtered data in session
-        workflow_state_manager.store_filtered_data(session_id, filtered_data)
+        workflow_state_manager.store_filtered_data(session_id, filtered_data, filtered_df)
         
         # Add to workflow history
         workflow_state_manager.add_workflow_step(session_id, "query_data", {
@@ -1422,7 +1967,8 @@ async def query_data(
             "rows_removed": len(df) - len(filtered_df)
         })
         
-        return {
+        # The rows are plain Python values already; skip FastAPI's per-value jsonable_encoder pass
+        return FastJSONResponse({
             "session_id": session_id,
             "query": query,
             "original_shape": list(df.shape),
@@ -1431,7 +1977,7 @@ async def query_data(
             "filtered_data": filtered_data,
             "columns": filtered_df.columns.tolist(),
             "sample_rows": filtered_df.head(5).to_dict('records') if len(filtered_df) > 0 else []
-        }
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -1439,6 +1985,14 @@ async def query_data(
             detail=f"Error querying data: {str(e)}"
         )
 
+# Rows written per chunk of a streamed CSV download
+CSV_CHUNK_ROWS = 50_000
+
+def iter_csv_chunks(df: "pd.DataFrame", chunk_rows: int = CSV_CHUNK_ROWS):
+    """Yield df as CSV bytes, chunk_rows rows at a time; the header comes with the first chunk"""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+
 @router.get("/download-filtered-data/{session_id}")
 async def download_filtered_data(
     session_id: str,
@@ -1455,26 +2009,21 @@ async def download_filtered_data(
     
     try:
         # Get filtered data from session
-        filtered_data = workflow_state_manager.get_filtered_data(session_id)
-        if not filtered_data:
+        df = workflow_state_manager.get_filtered_frame(session_id)
+        if df is None:
             raise HTTPException(
                 status_code=400,
                 detail="No filtered data found in session. Please query data first."
             )
         
-        # Convert to DataFrame
-        df = pd.DataFrame(filtered_data['rows'], columns=filtered_data['headers'])
-        
-        # Create CSV content
-        csv_content = df.to_csv(index=False)
-        
         # Create filename with timestamp
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"filtered_data_{timestamp}.csv"
         
-        return Response(
-            content=csv_content,
+        # Stream the CSV a block of rows at a time instead of building it as one string
+        return StreamingResponse(
+            iter_csv_chunks(df),
             media_type="text/csv",
             headers={
                 "Content-Disposition": f"attachment; filename={filename}",
@@ -1488,6 +2037,166 @@ async def download_filtered_data(
             detail=f"Error downloading filtered data: {str(e)}"
         )
 
+# Condition patterns of the query language, compiled once
+QUERY_EQUALS_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:=|is)\s*["\']?([^"\']+)["\']?')
+QUERY_LIKE_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:like|contains)\s*["\']?([^"\']+)["\']?')
+QUERY_COMPARISON_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(>=?|<=?|>|<)\s*([0-9.]+)')
+QUERY_IN_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s+in\s*\(([^)]+)\)')
+QUERY_NULL_PATTERN = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s+is\s+(not\s+)?null')
+QUERY_COMPARISON_UFUNCS = {'>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal}
+
+def character_similarities(requested: str, candidates: List[str]) -> List[float]:
+    """Best of fuzz.ratio and fuzz.partial_ratio between requested and each candidate"""
+    if RAPIDFUZZ_AVAILABLE:
+        # One call per scorer compares against every candidate in C++
+        ratios = process.cdist([requested], candidates, scorer=fuzz.ratio)[0]
+        partial_ratios = process.cdist([requested], candidates, scorer=fuzz.partial_ratio)[0]
+        # fuzzywuzzy rounds to whole numbers, which the match threshold was chosen against
+        return np.rint(np.maximum(ratios, partial_ratios)).astype(int).tolist()
+    return [max(fuzz.ratio(requested, candidate), fuzz.partial_ratio(requested, candidate))
+            for candidate in candidates]
+
+def comparable_values(series: pd.Series) -> np.ndarray:
+    """Column values as a plain NumPy array, so comparisons skip pandas' dispatch and alignment"""
+    if pd.api.types.is_numeric_dtype(series) and not isinstance(series.dtype, np.dtype):
+        # Nullable numbers would come out as objects holding pd.NA
+        return series.to_numpy(dtype=float, na_value=np.nan)
+    return series.to_numpy()
+
+def isin_ignoring_case(series: pd.Series, values: List[str]) -> pd.Series:
+    """Case-insensitive membership test without building a lowercased copy of the column"""
+    targets = {v.lower() for v in values}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Test each category once and look the rows up by code; code -1 (missing) hits the trailing False
+        category_matches = series.cat.categories.astype(str).str.lower().isin(targets)
+        mask = np.append(category_matches, False)[series.cat.codes.to_numpy()]
+    elif pd.api.types.is_string_dtype(series):
+        mask = np.fromiter((isinstance(x, str) and x.lower() in targets for x in series.to_numpy()),
+                           dtype=bool, count=len(series))
+    else:
+        mask = series.astype(str).str.lower().isin(targets).to_numpy()
+    return pd.Series(mask, index=series.index)
+
+@lru_cache(maxsize=64)
+def _query_column_lookup(columns: Tuple[str, ...]) -> Tuple[set, Dict[str, str], list, List[str]]:
+    """Column names lowercased and split into words, prepared once per set of columns"""
+    columns_by_lower = {}
+    for col in columns:
+        columns_by_lower.setdefault(col.lower(), col)
+    column_lookup = []
+    for col in columns:
+        # Handle column names with underscores
+        col_normalized = col.lower().replace('_', ' ')
+        column_lookup.append((col, col_normalized, col_normalized.split()))
+    normalized_columns = [col_normalized for _, col_normalized, _ in column_lookup]
+    return set(columns), columns_by_lower, column_lookup, normalized_columns
+
+@lru_cache(maxsize=1024)
+def match_query_column(requested_column: str, columns: Tuple[str, ...]) -> str:
+    """
+    Find the column of columns best matching a name used in a query, using
+    fuzzy matching; the requested name is returned when nothing scores above 60.
+    Cached, since the same names recur across conditions and queries.
+    """
+    if not columns:
+        return requested_column
+    column_set, columns_by_lower, column_lookup, normalized_columns = _query_column_lookup(columns)
+    
+    # Direct match first
+    if requested_column in column_set:
+        return requested_column
+    
+    # Try exact match with different cases
+    if requested_column.lower() in columns_by_lower:
+        return columns_by_lower[requested_column.lower()]
+    
+    # Fuzzy matching
+    best_match = None
+    best_score = 0
+    requested_normalized = requested_column.lower().replace('_', ' ')
+    requested_words = requested_normalized.split()
+    char_scores = character_similarities(requested_normalized, normalized_columns)
+    
+    for (col, col_normalized, col_words), char_score in zip(column_lookup, char_scores):
+        # Try different matching strategies
+        scores = []
+        
+        # Exact substring match
+        if requested_normalized in col_normalized or col_normalized in requested_normalized:
+            scores.append(90)
+        
+        # Word-based matching
+        word_matches = sum(1 for word in requested_words if any(word in cw for cw in col_words))
+        if word_matches > 0:
+            scores.append(70 + word_matches * 10)
+        
+        # Character-based similarity, whole and partial
+        scores.append(char_score)
+        
+        # Use the best score
+        score = max(scores)
+        
+        if score > best_score and score > 60:  # Minimum threshold
+            best_score = score
+            best_match = col
+    
+    return best_match if best_match else requested_column
+
+# A condition ending in "in" takes the parenthesized list that follows as its values
+QUERY_IN_LIST_PATTERN = re.compile(r'(?:^|\s)in\s*$')
+
+def _is_word_char(char: str) -> bool:
+    """Whether char can be part of a column name or keyword"""
+    return char.isalnum() or char == "_"
+
+def tokenize_query(expression: str) -> List[Tuple[str, str]]:
+    """
+    Split a lowercased filter expression into tokens in one pass: ("cond", text)
+    for each condition and ("and"|"or"|"not"|"("|")", text) for the logic around
+    them. Quoted text and the value list of "column in (...)" stay part of
+    their condition; "not" is an operator only where a condition starts.
+    """
+    tokens = []
+    condition = ""
+    
+    def flush():
+        nonlocal condition
+        if condition.strip():
+            tokens.append(("cond", condition.strip()))
+        condition = ""
+    
+    i = 0
+    while i < len(expression):
+        char = expression[i]
+        if char in "\"'" or (char == "(" and QUERY_IN_LIST_PATTERN.search(condition)):
+            # Copy through the closing quote or parenthesis
+            end = expression.find(char if char != "(" else ")", i + 1)
+            end = len(expression) - 1 if end == -1 else end
+            condition += expression[i:end + 1]
+            i = end + 1
+        elif char in "()":
+            flush()
+            tokens.append((char, char))
+            i += 1
+        elif _is_word_char(char) and (i == 0 or not _is_word_char(expression[i - 1])):
+            end = i
+            while end < len(expression) and _is_word_char(expression[end]):
+                end += 1
+            word = expression[i:end]
+            separated = ((i == 0 or expression[i - 1].isspace() or expression[i - 1] in "()")
+                         and (end == len(expression) or expression[end].isspace() or expression[end] in "()"))
+            if separated and (word in ("and", "or") or (word == "not" and not condition.strip())):
+                flush()
+                tokens.append((word, word))
+            else:
+                condition += word
+            i = end
+        else:
+            condition += char
+            i += 1
+    flush()
+    return tokens
+
 def parse_and_apply_query(df: pd.DataFrame, query: str) -> pd.DataFrame:
     """
     Parse natural language query and apply filters to DataFrame.
@@ -1513,66 +2222,28 @@ def parse_and_apply_query(df: pd.DataFrame, query: str) -> pd.DataFrame:
     if query_lower.startswith("where"):
         query_lower = query_lower[5:].strip()
     
-    # Function to find best column match (same as in visualization)
-    def find_best_column_match(requested_column: str, available_columns: list) -> str:
-        """Find the best matching column name using fuzzy matching"""
-        if not available_columns:
-            return requested_column
-        
-        # Direct match first
-        if requested_column in available_columns:
-            return requested_column
-        
-        # Try exact match with different cases
-        for col in available_columns:
-            if col.lower() == requested_column.lower():
-                return col
-        
-        # Fuzzy matching
-        best_match = None
-        best_score = 0
-        
-        for col in available_columns:
-            # Handle column names with underscores
-            col_normalized = col.lower().replace('_', ' ')
-            requested_normalized = requested_column.lower().replace('_', ' ')
-            
-            # Try different matching strategies
-            scores = []
-            
-            # Exact substring match
-            if requested_normalized in col_normalized or col_normalized in requested_normalized:
-                scores.append(90)
-            
-            # Word-based matching
-            requested_words = requested_normalized.split()
-            col_words = col_normalized.split()
-            
-            word_matches = sum(1 for word in requested_words if any(word in cw for cw in col_words))
-            if word_matches > 0:
-                scores.append(70 + word_matches * 10)
-            
-            # Character-based similarity
-            from fuzzywuzzy import fuzz
-            char_similarity = fuzz.ratio(requested_normalized, col_normalized)
-            scores.append(char_similarity)
-            
-            # Partial ratio for better matching
-            partial_ratio = fuzz.partial_ratio(requested_normalized, col_normalized)
-            scores.append(partial_ratio)
-            
-            # Use the best score
-            score = max(scores)
-            
-            if score > best_score and score > 60:  # Minimum threshold
-                best_score = score
-                best_match = col
-        
-        return best_match if best_match else requested_column
+    # Column matches are cached per set of column names, across conditions and queries
+    columns = tuple(df.columns)
     
-    def parse_single_condition(condition_text: str) -> pd.Series:
-        """Parse a single condition and return a boolean Series"""
+    def parse_single_condition(condition_text: str, live: np.ndarray) -> np.ndarray:
+        """Parse a single condition and return a boolean mask, evaluated on the live rows only"""
         condition_text = condition_text.strip()
+        if not live.any():
+            return live
+        live_positions = None if live.all() else np.flatnonzero(live)
+        
+        def live_values(matched_column: str) -> pd.Series:
+            values = df[matched_column]
+            return values if live_positions is None else values.iloc[live_positions]
+        
+        def scatter(condition) -> np.ndarray:
+            if isinstance(condition, pd.Series):
+                condition = condition.to_numpy(dtype=bool, na_value=False)
+            if live_positions is None:
+                return condition
+            mask = np.zeros(len(df), dtype=bool)
+            mask[live_positions] = condition
+            return mask
         
         # Handle NOT conditions
         is_not = False
@@ -1581,144 +2252,132 @@ def parse_and_apply_query(df: pd.DataFrame, query: str) -> pd.DataFrame:
             condition_text = condition_text[4:].strip()
         
         # Pattern 1: "column = value" or "column is value"
-        equals_pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:=|is)\s*["\']?([^"\']+)["\']?'
-        equals_matches = re.findall(equals_pattern, condition_text)
+        equals_matches = QUERY_EQUALS_PATTERN.findall(condition_text)
         for column, value in equals_matches:
-            matched_column = find_best_column_match(column, df.columns.tolist())
-            print(f"Column matching: requested '{column}' -> matched '{matched_column}'")
+            matched_column = match_query_column(column, columns)
+            logger.debug("Column matching: requested %r -> matched %r", column, matched_column)
             if matched_column in df.columns:
                 try:
                     numeric_value = float(value)
-                    condition = df[matched_column] == numeric_value
+                    condition = comparable_values(live_values(matched_column)) == numeric_value
                 except ValueError:
-                    condition = df[matched_column].astype(str).str.lower() == value.lower()
-                return ~condition if is_not else condition
+                    condition = live_values(matched_column).astype(str).str.lower() == value.lower()
+                return scatter(~condition if is_not else condition)
         
         # Pattern 2: "column like pattern" or "column contains pattern"
-        like_pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:like|contains)\s*["\']?([^"\']+)["\']?'
-        like_matches = re.findall(like_pattern, condition_text)
+        like_matches = QUERY_LIKE_PATTERN.findall(condition_text)
         for column, pattern in like_matches:
-            matched_column = find_best_column_match(column, df.columns.tolist())
-            print(f"Column matching: requested '{column}' -> matched '{matched_column}'")
+            matched_column = match_query_column(column, columns)
+            logger.debug("Column matching: requested %r -> matched %r", column, matched_column)
             if matched_column in df.columns:
-                condition = df[matched_column].astype(str).str.lower().str.contains(pattern.lower(), na=False)
-                return ~condition if is_not else condition
+                # One case-insensitive regex pass instead of lowercasing a copy first
+                values = live_values(matched_column)
+                if not pd.api.types.is_string_dtype(values):
+                    values = values.astype(str)
+                condition = values.str.contains(re.compile(re.escape(pattern), re.IGNORECASE), na=False)
+                return scatter(~condition if is_not else condition)
         
         # Pattern 3: "column > value" or "column >= value" or "column < value" or "column <= value"
-        comparison_pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(>=?|<=?|>|<)\s*([0-9.]+)'
-        comparison_matches = re.findall(comparison_pattern, condition_text)
+        comparison_matches = QUERY_COMPARISON_PATTERN.findall(condition_text)
         for column, operator, value in comparison_matches:
-            matched_column = find_best_column_match(column, df.columns.tolist())
-            print(f"Column matching: requested '{column}' -> matched '{matched_column}'")
+            matched_column = match_query_column(column, columns)
+            logger.debug("Column matching: requested %r -> matched %r", column, matched_column)
             if matched_column in df.columns:
                 try:
-                    numeric_value = float(value)
-                    if operator == '>':
-                        condition = df[matched_column] > numeric_value
-                    elif operator == '>=':
-                        condition = df[matched_column] >= numeric_value
-                    elif operator == '<':
-                        condition = df[matched_column] < numeric_value
-                    elif operator == '<=':
-                        condition = df[matched_column] <= numeric_value
-                    return ~condition if is_not else condition
+                    numeric_value = np.float64(value)
+                    condition = QUERY_COMPARISON_UFUNCS[operator](
+                        comparable_values(live_values(matched_column)), numeric_value
+                    )
+                    return scatter(~condition if is_not else condition)
                 except ValueError:
                     continue
         
         # Pattern 4: "column in (value1, value2, ...)"
-        in_pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s+in\s*\(([^)]+)\)'
-        in_matches = re.findall(in_pattern, condition_text)
+        in_matches = QUERY_IN_PATTERN.findall(condition_text)
         for column, values_str in in_matches:
-            matched_column = find_best_column_match(column, df.columns.tolist())
-            print(f"Column matching: requested '{column}' -> matched '{matched_column}'")
+            matched_column = match_query_column(column, columns)
+            logger.debug("Column matching: requested %r -> matched %r", column, matched_column)
             if matched_column in df.columns:
                 values = [v.strip().strip('"\'') for v in values_str.split(',')]
-                condition = df[matched_column].astype(str).str.lower().isin([v.lower() for v in values])
-                return ~condition if is_not else condition
+                condition = isin_ignoring_case(live_values(matched_column), values)
+                return scatter(~condition if is_not else condition)
         
         # Pattern 5: "column is not null" or "column is null"
-        null_pattern = r'([a-zA-Z_][a-zA-Z0-9_]*)\s+is\s+(not\s+)?null'
-        null_matches = re.findall(null_pattern, condition_text)
+        null_matches = QUERY_NULL_PATTERN.findall(condition_text)
         for column, not_null in null_matches:
-            matched_column = find_best_column_match(column, df.columns.tolist())
-            print(f"Column matching: requested '{column}' -> matched '{matched_column}'")
+            matched_column = match_query_column(column, columns)
+            logger.debug("Column matching: requested %r -> matched %r", column, matched_column)
             if matched_column in df.columns:
                 if not_null:
-                    condition = df[matched_column].notna()
+                    condition = live_values(matched_column).notna()
                 else:
-                    condition = df[matched_column].isna()
-                return ~condition if is_not else condition
+                    condition = live_values(matched_column).isna()
+                return scatter(~condition if is_not else condition)
         
         # If no pattern matches, return all True (no filtering)
-        return pd.Series([True] * len(df))
-    
-    def parse_logical_expression(expression: str) -> pd.Series:
-        """Parse logical expression with AND, OR, NOT operators"""
-        expression = expression.strip()
-        
-        # Handle parentheses first (recursive)
-        while '(' in expression and ')' in expression:
-            start = expression.rfind('(')
-            end = expression.find(')', start)
-            if start != -1 and end != -1:
-                inner_expr = expression[start+1:end]
-                inner_result = parse_logical_expression(inner_expr)
-                # Replace the parenthesized expression with a placeholder
-                expression = expression[:start] + f"__PLACEHOLDER_{len(inner_result)}__" + expression[end+1:]
-                # Store the result for later replacement
-                if not hasattr(parse_logical_expression, 'placeholders'):
-                    parse_logical_expression.placeholders = {}
-                parse_logical_expression.placeholders[f"__PLACEHOLDER_{len(inner_result)}__"] = inner_result
-        
-        # Split by OR (lower precedence)
-        or_parts = [part.strip() for part in re.split(r'\s+or\s+', expression, flags=re.IGNORECASE)]
-        
-        if len(or_parts) > 1:
-            # Handle OR logic
-            results = []
-            for part in or_parts:
-                if part.startswith("__PLACEHOLDER_") and hasattr(parse_logical_expression, 'placeholders'):
-                    results.append(parse_logical_expression.placeholders[part])
-                else:
-                    results.append(parse_single_condition(part))
-            
-            # Combine with OR
-            combined = results[0]
-            for result in results[1:]:
-                combined = combined | result
-            return combined
-        
-        # Split by AND (higher precedence)
-        and_parts = [part.strip() for part in re.split(r'\s+and\s+', expression, flags=re.IGNORECASE)]
-        
-        if len(and_parts) > 1:
-            # Handle AND logic
-            results = []
-            for part in and_parts:
-                if part.startswith("__PLACEHOLDER_") and hasattr(parse_logical_expression, 'placeholders'):
-                    results.append(parse_logical_expression.placeholders[part])
-                else:
-                    results.append(parse_single_condition(part))
-            
-            # Combine with AND
-            combined = results[0]
-            for result in results[1:]:
-                combined = combined & result
-            return combined
-        
-        # Single condition
-        if expression.startswith("__PLACEHOLDER_") and hasattr(parse_logical_expression, 'placeholders'):
-            return parse_logical_expression.placeholders[expression]
-        else:
-            return parse_single_condition(expression)
+        return all_rows
     
-    # Parse the logical expression
-    result_condition = parse_logical_expression(query_lower)
+    # Recursive descent over the tokens: "or" binds loosest, then "and", then "not".
+    # Each step gets the mask of rows whose result is still undecided (live), so the
+    # right side of "and" only looks at rows the left kept, and of "or" at rows it dropped;
+    # masks are only meaningful on their live rows.
+    tokens = tokenize_query(query_lower)
+    position = 0
+    # Shared "no filtering" mask; masks are combined into new arrays, never modified in place
+    all_rows = np.ones(len(df), dtype=bool)
     
-    # Apply the condition
-    if result_condition is not None:
-        filtered_df = df[result_condition]
-    else:
+    def peek() -> Optional[str]:
+        return tokens[position][0] if position < len(tokens) else None
+    
+    def parse_or(live: np.ndarray) -> np.ndarray:
+        nonlocal position
+        result = parse_and(live)
+        while peek() == "or":
+            position += 1
+            result = result | parse_and(live & ~result)
+        return result
+    
+    def parse_and(live: np.ndarray) -> np.ndarray:
+        nonlocal position
+        result = parse_not(live)
+        while peek() == "and":
+            position += 1
+            result = result & parse_not(live & result)
+        return result
+    
+    def parse_not(live: np.ndarray) -> np.ndarray:
+        nonlocal position
+        if peek() == "not":
+            position += 1
+            return ~parse_not(live)
+        return parse_atom(live)
+    
+    def parse_atom(live: np.ndarray) -> np.ndarray:
+        nonlocal position
+        kind = peek()
+        if kind == "(":
+            position += 1
+            result = parse_or(live)
+            if peek() == ")":
+                position += 1
+            return result
+        if kind == "cond":
+            position += 1
+            return parse_single_condition(tokens[position - 1][1], live)
+        # Missing operand (empty query or dangling operator): no filtering
+        return all_rows
+    
+    # Parse the logical expression; text after an unmatched ")" is ANDed on
+    result_condition = parse_or(all_rows)
+    while position < len(tokens):
+        position += 1
+        result_condition = result_condition & parse_or(result_condition)
+    
+    # Apply the condition; a query that filters nothing returns the frame without copying it.
+    # Kept rows are taken by position, which skips pandas' boolean-indexer validation
+    if result_condition.all():
         filtered_df = df
+    else:
+        filtered_df = df.take(np.flatnonzero(result_condition))
     
     return filtered_df 
\ No newline at end of file
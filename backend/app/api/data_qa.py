@@ -4,9 +4,29 @@ from typing import Dict, Any, Optional
 from ..database import get_db
 from ..services.data_qa_service import DataQAService
 from pydantic import BaseModel
+import re
 
 router = APIRouter()
 
+# Column name fragments that suggest a numeric or a categorical column, matched anywhere in the name
+NUMERIC_COLUMN_PATTERN = re.compile(r'price|amount|count|number|value', re.IGNORECASE)
+CATEGORICAL_COLUMN_PATTERN = re.compile(r'category|type|status|name|id', re.IGNORECASE)
+
+# Questions any session can ask, offered after the ones about its files
+GENERAL_SUGGESTIONS = (
+    "What are the data types of the columns?",
+    "How many files do I have?",
+    "What are the file names?",
+    "Are there any missing values?",
+    "What numeric columns are available?",
+    "Show me a summary of the data"
+)
+MAX_SUGGESTIONS = 10
+
+def first_matching_column(columns: list, pattern: re.Pattern) -> Optional[str]:
+    """The first column whose name contains one of pattern's keywords"""
+    return next((col for col in columns if pattern.search(col)), None)
+
 class DataQuestionRequest(BaseModel):
     session_id: str
     question: str
@@ -72,8 +92,10 @@ async def get_question_suggestions(
         suggestions = []
         preview_data = preview.get("preview", {})
         
-        # Generate suggestions based on data characteristics
+        # Generate suggestions based on data characteristics, until there are enough
         for file_name, file_data in preview_data.items():
+            if len(suggestions) >= MAX_SUGGESTIONS:
+                break
             if "error" in file_data:
                 continue
                 
@@ -85,30 +107,23 @@ async def get_question_suggestions(
             suggestions.append(f"What columns are available in {file_name}?")
             
             # Numeric column suggestions
-            numeric_cols = [col for col in columns if any(keyword in col.lower() for keyword in ['price', 'amount', 'count', 'number', 'value'])]
-            if numeric_cols:
-                suggestions.append(f"What are the statistics for {numeric_cols[0]} in {file_name}?")
+            numeric_col = first_matching_column(columns, NUMERIC_COLUMN_PATTERN)
+            if numeric_col:
+                suggestions.append(f"What are the statistics for {numeric_col} in {file_name}?")
             
             # Categorical column suggestions
-            categorical_cols = [col for col in columns if any(keyword in col.lower() for keyword in ['category', 'type', 'status', 'name', 'id'])]
-            if categorical_cols:
-                suggestions.append(f"What are the unique values in {categorical_cols[0]}?")
+            categorical_col = first_matching_column(columns, CATEGORICAL_COLUMN_PATTERN)
+            if categorical_col:
+                suggestions.append(f"What are the unique values in {categorical_col}?")
             
             # Missing data suggestions
             if rows > 0:
                 suggestions.append(f"Are there any missing values in {file_name}?")
         
-        # Add general suggestions that the system can actually answer
-        suggestions.extend([
-            "What are the data types of the columns?",
-            "How many files do I have?",
-            "What are the file names?",
-            "Are there any missing values?",
-            "What numeric columns are available?",
-            "Show me a summary of the data"
-        ])
+        # Fill up with general suggestions that the system can actually answer
+        suggestions.extend(GENERAL_SUGGESTIONS[:max(MAX_SUGGESTIONS - len(suggestions), 0)])
         
-        return {"suggestions": suggestions[:10]}  # Limit to 10 suggestions
+        return {"suggestions": suggestions[:MAX_SUGGESTIONS]}
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get suggestions: {str(e)}")
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File as FastAPIFile
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File as FastAPIFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..database import get_db
@@ -14,6 +15,7 @@ from ..schemas.dataset import (
 from ..services.matching_service import MatchingService
 from ..services.file_service import FileService
 import os
+import shutil
 
 router = APIRouter(prefix="/datasets", tags=["datasets"])
 
@@ -77,8 +79,7 @@ async def process_dataset(
     temp_path = f"temp_{file.filename}"
     try:
         with open(temp_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+            await run_in_threadpool(shutil.copyfileobj, file.file, buffer)
         
         # Create dataset record
         dataset = Dataset(
@@ -154,12 +155,14 @@ def auto_match_dataset(
 @router.get("/{dataset_id}/matches", response_model=List[DatasetMatchResponse])
 def get_dataset_matches(
     dataset_id: int,
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
     db: Session = Depends(get_db)
 ):
-    """Get all matches for a dataset."""
+    """Get all matches for a dataset, a page at a time."""
     matches = db.query(DatasetMatch).filter(
         DatasetMatch.dataset_id == dataset_id
-    ).all()
+    ).order_by(DatasetMatch.id).offset(skip).limit(limit).all()
     return matches
 
 # Dataset match management endpoints
@@ -201,10 +204,12 @@ def reject_match(
 @router.get("/workflow/{workflow_id}/matches", response_model=List[DatasetMatchResponse])
 def get_workflow_matches(
     workflow_id: int,
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
     db: Session = Depends(get_db)
 ):
-    """Get all dataset matches for a workflow."""
+    """Get all dataset matches for a workflow, a page at a time."""
     matches = db.query(DatasetMatch).filter(
         DatasetMatch.workflow_id == workflow_id
-    ).all()
+    ).order_by(DatasetMatch.id).offset(skip).limit(limit).all()
     return matches 
\ No newline at end of file
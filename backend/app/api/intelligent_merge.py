@@ -4,11 +4,13 @@ Provides endpoints for analyzing and merging multiple files intelligently
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any, Optional
 import tempfile
 import os
+import shutil
 import uuid
 from pathlib import Path
 
@@ -44,9 +46,9 @@ async def analyze_files_for_merge(
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(upload_file.filename).suffix)
             temp_files.append(temp_file.name)
             
-            # Write uploaded content to temp file
-            content = await upload_file.read()
-            temp_file.write(content)
+            # Copy the spooled upload to the temp file in blocks, off the event loop
+            await run_in_threadpool(shutil.copyfileobj, upload_file.file, temp_file)
+            file_size = temp_file.tell()
             temp_file.close()
             
             # Create file info for analysis
@@ -55,7 +57,7 @@ async def analyze_files_for_merge(
                 'file_id': str(uuid.uuid4()),
                 'filename': upload_file.filename,
                 'content_type': upload_file.content_type,
-                'size': len(content)
+                'size': file_size
             }
             file_infos.append(file_info)
         
@@ -137,9 +139,9 @@ async def execute_merge(
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(upload_file.filename).suffix)
             temp_files.append(temp_file.name)
             
-            # Write uploaded content to temp file
-            content = await upload_file.read()
-            temp_file.write(content)
+            # Copy the spooled upload to the temp file in blocks, off the event loop
+            await run_in_threadpool(shutil.copyfileobj, upload_file.file, temp_file)
+            file_size = temp_file.tell()
             temp_file.close()
             
             # Create file info for merge
@@ -148,7 +150,7 @@ async def execute_merge(
                 'file_id': str(uuid.uuid4()),
                 'filename': upload_file.filename,
                 'content_type': upload_file.content_type,
-                'size': len(content)
+                'size': file_size
             }
             file_infos.append(file_info)
         
@@ -238,9 +240,9 @@ async def analyze_and_suggest_merge(
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=Path(upload_file.filename).suffix)
             temp_files.append(temp_file.name)
             
-            # Write uploaded content to temp file
-            content = await upload_file.read()
-            temp_file.write(content)
+            # Copy the spooled upload to the temp file in blocks, off the event loop
+            await run_in_threadpool(shutil.copyfileobj, upload_file.file, temp_file)
+            file_size = temp_file.tell()
             temp_file.close()
             
             # Create file info for analysis
@@ -249,7 +251,7 @@ async def analyze_and_suggest_merge(
                 'file_id': str(uuid.uuid4()),
                 'filename': upload_file.filename,
                 'content_type': upload_file.content_type,
-                'size': len(content)
+                'size': file_size
             }
             file_infos.append(file_info)
         
@@ -14,6 +14,14 @@ from ..schemas.workflow import (
 
 router = APIRouter(prefix="/workflows", tags=["workflows"])
 
+def get_workflow_or_404(workflow_id: int, db: Session = Depends(get_db)) -> Workflow:
+    """Load the workflow of the path by primary key, or fail with 404."""
+    # Session.get checks the identity map before issuing a primary-key SELECT
+    workflow = db.get(Workflow, workflow_id)
+    if not workflow:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return workflow
+
 # Workflow endpoints
 @router.post("/", response_model=WorkflowResponse, status_code=status.HTTP_201_CREATED)
 def create_workflow(
@@ -38,11 +46,8 @@ def get_workflows(
     return workflows
 
 @router.get("/{workflow_id}", response_model=WorkflowResponse)
-def get_workflow(workflow_id: int, db: Session = Depends(get_db)):
+def get_workflow(workflow: Workflow = Depends(get_workflow_or_404)):
     """Get a specific workflow."""
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
     return workflow
 
 @router.put("/{workflow_id}", response_model=WorkflowResponse)
@@ -52,25 +57,22 @@ def update_workflow(
     db: Session = Depends(get_db)
 ):
     """Update a workflow."""
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
     update_data = workflow_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(workflow, field, value)
+    if not update_data:
+        return get_workflow_or_404(workflow_id, db)
+    
+    # One UPDATE, whose row count also tells whether the workflow exists
+    updated = db.query(Workflow).filter(Workflow.id == workflow_id).update(update_data, synchronize_session=False)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Workflow not found")
     
     db.commit()
-    db.refresh(workflow)
-    return workflow
+    # Read the row back once, including the server-set updated_at
+    return db.get(Workflow, workflow_id, populate_existing=True)
 
 @router.delete("/{workflow_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_workflow(workflow_id: int, db: Session = Depends(get_db)):
+def delete_workflow(workflow: Workflow = Depends(get_workflow_or_404), db: Session = Depends(get_db)):
     """Delete a workflow."""
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
     db.delete(workflow)
     db.commit()
     return None
@@ -78,17 +80,12 @@ def delete_workflow(workflow_id: int, db: Session = Depends(get_db)):
 # Workflow Step endpoints
 @router.post("/{workflow_id}/steps", response_model=WorkflowStepResponse, status_code=status.HTTP_201_CREATED)
 def create_workflow_step(
-    workflow_id: int,
     step: WorkflowStepCreate,
+    workflow: Workflow = Depends(get_workflow_or_404),
     db: Session = Depends(get_db)
 ):
     """Create a new workflow step."""
-    # Verify workflow exists
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
-    db_step = WorkflowStep(**step.dict(), workflow_id=workflow_id)
+    db_step = WorkflowStep(**step.dict(), workflow_id=workflow.id)
     db.add(db_step)
     db.commit()
     db.refresh(db_step)
@@ -96,17 +93,12 @@ def create_workflow_step(
 
 @router.get("/{workflow_id}/steps", response_model=List[WorkflowStepResponse])
 def get_workflow_steps(
-    workflow_id: int,
+    workflow: Workflow = Depends(get_workflow_or_404),
     db: Session = Depends(get_db)
 ):
     """Get all steps for a workflow."""
-    # Verify workflow exists
-    workflow = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-    if not workflow:
-        raise HTTPException(status_code=404, detail="Workflow not found")
-    
     steps = db.query(WorkflowStep).filter(
-        WorkflowStep.workflow_id == workflow_id
+        WorkflowStep.workflow_id == workflow.id
     ).order_by(WorkflowStep.order_index).all()
     return steps
 
@@ -133,20 +125,22 @@ def update_workflow_step(
     db: Session = Depends(get_db)
 ):
     """Update a workflow step."""
-    step = db.query(WorkflowStep).filter(
+    step_query = db.query(WorkflowStep).filter(
         WorkflowStep.id == step_id,
         WorkflowStep.workflow_id == workflow_id
-    ).first()
-    if not step:
-        raise HTTPException(status_code=404, detail="Workflow step not found")
-    
+    )
     update_data = step_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(step, field, value)
+    
+    # One UPDATE, whose row count also tells whether the step exists
+    if not update_data:
+        updated = step_query.count()
+    else:
+        updated = step_query.update(update_data, synchronize_session=False)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Workflow step not found")
     
     db.commit()
-    db.refresh(step)
-    return step
+    return db.get(WorkflowStep, step_id, populate_existing=True)
 
 @router.delete("/{workflow_id}/steps/{step_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_workflow_step(
@@ -0,0 +1,33 @@
+"""
+Response classes and encoders shared by the API routers
+"""
+
+from fastapi.responses import JSONResponse
+from typing import Any
+import json
+
+# orjson is optional; it encodes responses in C and handles NumPy values and NaN
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson when it is installed. NumPy scalars and
+    arrays are serialized natively and NaN is written as null.
+    Endpoints returning large, already JSON-safe row lists return this class
+    directly, which also skips FastAPI's per-value jsonable_encoder pass.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        if not ORJSON_AVAILABLE:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def json_line(value: Any) -> bytes:
+    """value as one line of JSON, encoded like FastJSONResponse"""
+    if not ORJSON_AVAILABLE:
+        return json.dumps(value).encode("utf-8") + b"\n"
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Union, BinaryIO
 from dataclasses import dataclass
 from enum import Enum
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import hashlib
 import json
+import os
+import threading
 
 
 class AnalysisType(Enum):
@@ -25,37 +31,184 @@ class DataInsight:
     recommendations: List[str]
 
 
+@dataclass(frozen=True)
+class DataFrameSchema:
+    """Column names, shape and dtypes of a parsed dataset, captured once after loading"""
+    columns: Tuple[str, ...]
+    shape: Tuple[int, int]
+    dtypes: Tuple[np.dtype, ...]
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "DataFrameSchema":
+        return cls(
+            columns=tuple(str(col) for col in df.columns),
+            shape=(int(df.shape[0]), int(df.shape[1])),
+            dtypes=tuple(df.dtypes)
+        )
+
+
+def compute_correlation_matrix(numeric_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pearson correlation matrix of numeric columns.
+    Complete data is handled with a single matrix product on the normalized
+    columns; data with missing values falls back to pandas' pairwise .corr().
+    """
+    values = numeric_df.to_numpy(dtype=np.float64)
+    if values.shape[0] < 2 or not np.isfinite(values).all():
+        return numeric_df.corr()
+    
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt((centered * centered).sum(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        normalized = centered / norms
+    corr = np.clip(normalized.T @ normalized, -1.0, 1.0)
+    
+    # Constant columns have no defined correlation, matching pandas
+    constant = norms == 0
+    corr[constant, :] = np.nan
+    corr[:, constant] = np.nan
+    np.fill_diagonal(corr, np.where(constant, np.nan, 1.0))
+    
+    return pd.DataFrame(corr, index=numeric_df.columns, columns=numeric_df.columns)
+
+
+# Shared pool for the independent analysis passes; pandas/NumPy release the GIL in their C loops
+_analysis_pool = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="data-analyzer"
+)
+
+
+def downcast_float_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return df with float64 columns stored as float32.
+    Halves the memory scanned by the statistical reductions; the reported
+    statistics are rounded to a few digits, well within float32 precision.
+    """
+    float_cols = df.select_dtypes(include=['float64']).columns
+    if len(float_cols) == 0:
+        return df
+    return df.astype({col: np.float32 for col in float_cols})
+
+
+def downcast_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return df with float64 columns stored as float32 and integer columns in
+    the smallest integer type that holds their values.
+    """
+    df = downcast_float_columns(df)
+    int_cols = df.select_dtypes(include=['integer']).columns
+    if len(int_cols) == 0:
+        return df
+    return df.assign(**{col: pd.to_numeric(df[col], downcast='integer') for col in int_cols})
+
+
+# Read size when hashing an upload from its file object
+HASH_BLOCK_SIZE = 1 << 20
+
+
 class DataAnalyzer:
-    def __init__(self):
-        self.insights = []
+    def __init__(self, cache_size: int = 32):
+        self.cache_size = cache_size
+        self._analysis_cache: "OrderedDict[str, Tuple[Dict[str, Any], DataFrameSchema]]" = OrderedDict()
+        # The analyzer is a shared singleton and requests run in the threadpool
+        self._cache_lock = threading.Lock()
+    
+    @staticmethod
+    def compute_data_hash(data: Union[bytes, BinaryIO], precision: str = "fast") -> str:
+        """
+        Content hash of the raw dataset and precision, used as the analysis cache key.
+        A binary file object is hashed in blocks and rewound, so uploads don't
+        have to be read into memory first.
+        """
+        if isinstance(data, bytes):
+            digest = hashlib.sha256(data)
+        else:
+            digest = hashlib.sha256()
+            start = data.tell()
+            for block in iter(lambda: data.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+            data.seek(start)
+        digest.update(precision.encode('utf-8'))
+        return digest.hexdigest()
+    
+    def get_cached_analysis(self, data_hash: str, session_id: str = None) -> Optional[Dict[str, Any]]:
+        """Return a copy of a previously computed analysis for the same data, if any"""
+        with self._cache_lock:
+            cached = self._analysis_cache.get(data_hash)
+            if cached is None:
+                return None
+            self._analysis_cache.move_to_end(data_hash)
+        # Callers may modify the result, which must not change the cached entry
+        return {**copy.deepcopy(cached[0]), "session_id": session_id}
+    
+    def get_cached_schema(self, data_hash: str) -> Optional[DataFrameSchema]:
+        """Return the schema of a previously analyzed dataset, if any"""
+        with self._cache_lock:
+            cached = self._analysis_cache.get(data_hash)
+        return cached[1] if cached is not None else None
     
-    def analyze_dataset(self, df: pd.DataFrame, session_id: str = None) -> Dict[str, Any]:
+    def invalidate_cache(self, data_hash: Optional[str] = None) -> None:
+        """Drop one cached analysis, or all of them when no hash is given"""
+        with self._cache_lock:
+            if data_hash is None:
+                self._analysis_cache.clear()
+            else:
+                self._analysis_cache.pop(data_hash, None)
+    
+    def analyze_dataset(self, df: pd.DataFrame, session_id: str = None,
+                        data_hash: Optional[str] = None, precision: str = "fast",
+                        schema: Optional[DataFrameSchema] = None) -> Dict[str, Any]:
         """
-        Comprehensive analysis of a dataset with insights and recommendations
+        Comprehensive analysis of a dataset with insights and recommendations.
+        When data_hash is given the result is memoized under that key.
+        precision="fast" runs the statistics in float32; "full" keeps float64.
+        schema is the DataFrameSchema taken when df was parsed; it is derived here if omitted.
         """
-        self.insights = []
+        if data_hash is not None:
+            cached = self.get_cached_analysis(data_hash, session_id)
+            if cached is not None:
+                return cached
+        
+        insights = []
+        
+        if schema is None:
+            schema = DataFrameSchema.from_dataframe(df)
         
         # Basic dataset information
-        dataset_info = self._analyze_dataset_info(df)
+        dataset_info = self._analyze_dataset_info(df, schema)
         
-        # Data quality analysis
-        quality_insights = self._analyze_data_quality(df)
+        # Statistics below don't need double precision; dataset_info keeps the loaded dtypes
+        if precision == "fast":
+            df = downcast_float_columns(df)
         
-        # Statistical analysis
-        statistical_insights = self._analyze_statistics(df)
+        # The passes below only read df, so they run concurrently
+        quality_future = _analysis_pool.submit(self._analyze_data_quality, df)
+        statistics_future = _analysis_pool.submit(self._analyze_statistics, df)
+        patterns_future = _analysis_pool.submit(self._analyze_patterns, df)
+        
+        # Correlation matrix is shared by the correlation analysis and the recommendations
+        corr_matrix = self._compute_correlation_matrix(df)
+        recommendations_future = _analysis_pool.submit(self._generate_recommendations, df, corr_matrix)
         
         # Correlation analysis
-        correlation_insights = self._analyze_correlations(df)
+        correlation_insights = self._analyze_correlations(df, corr_matrix)
+        
+        # Data quality analysis
+        quality_insights = quality_future.result()
+        
+        # Statistical analysis
+        statistical_insights = statistics_future.result()
         
         # Pattern detection
-        pattern_insights = self._analyze_patterns(df)
+        pattern_insights = patterns_future.result()
         
         # Recommendations
-        recommendations = self._generate_recommendations(df)
+        recommendations = recommendations_future.result()
         
-        return {
+        result = {
             "dataset_info": dataset_info,
-            "insights": self.insights,
+            "insights": insights,
             "quality_analysis": quality_insights,
             "statistical_analysis": statistical_insights,
             "correlation_analysis": correlation_insights,
@@ -63,20 +216,31 @@ class DataAnalyzer:
             "recommendations": recommendations,
             "session_id": session_id
         }
+        
+        if data_hash is not None:
+            # Cache a copy, so changes to the returned result don't reach later hits
+            entry = (copy.deepcopy(result), schema)
+            with self._cache_lock:
+                self._analysis_cache[data_hash] = entry
+                self._analysis_cache.move_to_end(data_hash)
+                while len(self._analysis_cache) > self.cache_size:
+                    self._analysis_cache.popitem(last=False)
+        
+        return result
     
-    def _analyze_dataset_info(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _analyze_dataset_info(self, df: pd.DataFrame, schema: DataFrameSchema) -> Dict[str, Any]:
         """Analyze basic dataset information"""
         numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         categorical_cols = df.select_dtypes(include=['object']).columns.tolist()
         
         return {
-            "shape": [int(df.shape[0]), int(df.shape[1])],
-            "total_rows": int(len(df)),
-            "total_columns": int(len(df.columns)),
+            "shape": list(schema.shape),
+            "total_rows": schema.shape[0],
+            "total_columns": schema.shape[1],
             "numeric_columns": numeric_cols,
             "categorical_columns": categorical_cols,
             "memory_usage": int(df.memory_usage(deep=True).sum()),
-            "column_types": {str(k): str(v) for k, v in df.dtypes.to_dict().items()}
+            "column_types": {col: str(dtype) for col, dtype in zip(schema.columns, schema.dtypes)}
         }
     
     def _analyze_data_quality(self, df: pd.DataFrame) -> Dict[str, Any]:
@@ -155,24 +319,34 @@ class DataAnalyzer:
             }
         }
     
-    def _analyze_correlations(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Analyze correlations between numeric columns"""
+    def _compute_correlation_matrix(self, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Compute the correlation matrix of the numeric columns once per analysis"""
         numeric_df = df.select_dtypes(include=[np.number])
         
         if len(numeric_df.columns) < 2:
-            return {"message": "Need at least 2 numeric columns for correlation analysis"}
+            return None
+        
+        return compute_correlation_matrix(numeric_df)
+    
+    def _analyze_correlations(self, df: pd.DataFrame, corr_matrix: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """Analyze correlations between numeric columns"""
+        if corr_matrix is None:
+            corr_matrix = self._compute_correlation_matrix(df)
         
-        corr_matrix = numeric_df.corr()
+        if corr_matrix is None:
+            return {"message": "Need at least 2 numeric columns for correlation analysis"}
         
         # Find strong correlations
         strong_correlations = []
-        for i in range(len(corr_matrix.columns)):
-            for j in range(i+1, len(corr_matrix.columns)):
-                corr_value = corr_matrix.iloc[i, j]
+        columns = corr_matrix.columns.to_numpy()
+        values = corr_matrix.to_numpy()
+        for i in range(len(columns)):
+            for j in range(i+1, len(columns)):
+                corr_value = values[i, j]
                 if abs(corr_value) > 0.7:  # Strong correlation threshold
                     strong_correlations.append({
-                        "column1": corr_matrix.columns[i],
-                        "column2": corr_matrix.columns[j],
+                        "column1": columns[i],
+                        "column2": columns[j],
                         "correlation": float(corr_value),
                         "strength": "strong" if abs(corr_value) > 0.8 else "moderate"
                     })
@@ -238,7 +412,7 @@ class DataAnalyzer:
         outliers = series[(series < lower_bound) | (series > upper_bound)]
         return outliers.index.tolist()
     
-    def _generate_recommendations(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+    def _generate_recommendations(self, df: pd.DataFrame, corr_matrix: Optional[pd.DataFrame] = None) -> List[Dict[str, Any]]:
         """Generate intelligent recommendations based on analysis"""
         recommendations = []
         
@@ -257,12 +431,15 @@ class DataAnalyzer:
         # Correlation recommendations
         numeric_df = df.select_dtypes(include=[np.number])
         if len(numeric_df.columns) >= 2:
-            corr_matrix = numeric_df.corr()
+            if corr_matrix is None:
+                corr_matrix = self._compute_correlation_matrix(df)
             high_corr_pairs = []
-            for i in range(len(corr_matrix.columns)):
-                for j in range(i+1, len(corr_matrix.columns)):
-                    if abs(corr_matrix.iloc[i, j]) > 0.9:
-                        high_corr_pairs.append((corr_matrix.columns[i], corr_matrix.columns[j]))
+            columns = corr_matrix.columns.to_numpy()
+            values = corr_matrix.to_numpy()
+            for i in range(len(columns)):
+                for j in range(i+1, len(columns)):
+                    if abs(values[i, j]) > 0.9:
+                        high_corr_pairs.append((columns[i], columns[j]))
             
             if high_corr_pairs:
                 recommendations.append({
@@ -310,4 +487,8 @@ class DataAnalyzer:
                 "action": "Consider encoding categorical variables for analysis"
             })
         
-        return recommendations 
\ No newline at end of file
+        return recommendations 
+
+
+# Global instance
+data_analyzer = DataAnalyzer()
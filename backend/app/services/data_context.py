@@ -5,6 +5,8 @@ import json
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .data_analyzer import DataFrameSchema
+
 class DataType(Enum):
     UPLOADED_FILE = "uploaded_file"
     MERGED_DATASET = "merged_dataset"
@@ -190,7 +192,7 @@ class DataContextManager:
         return None
     
     def add_analysis(self, session_id: str, analysis_type: str, analysis_data: Dict[str, Any],
-                    columns: List[str], data_shape: List[int]) -> str:
+                    schema: DataFrameSchema) -> str:
         """Add an analysis result to the context"""
         self.create_session(session_id)
         
@@ -202,8 +204,8 @@ class DataContextManager:
             description=f"Comprehensive data analysis with insights and recommendations",
             metadata={
                 "analysis_type": analysis_type,
-                "columns": columns,
-                "data_shape": data_shape,
+                "columns": schema.columns,
+                "data_shape": schema.shape,
                 "insights_count": len(analysis_data.get("insights", [])),
                 "recommendations_count": len(analysis_data.get("recommendations", [])),
                 "quality_issues": analysis_data.get("quality_analysis", {}).get("total_issues", 0)
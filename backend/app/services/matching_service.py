@@ -1,8 +1,8 @@
 from typing import List, Dict, Any, Optional, Tuple
 from fuzzywuzzy import fuzz, process
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from ..models.workflow import Workflow, WorkflowStep
-from ..models.file import File, FileMetadata
+from ..models.file import File
 from ..models.dataset import Dataset, DatasetMatch, MatchType, DatasetStatus
 from ..schemas.dataset import MatchingConfig
 
@@ -46,12 +46,8 @@ class MatchingService:
         
         for file in workflow_files:
             if file.file_type.value in ['csv', 'excel']:
-                # Get file metadata
-                metadata = db.query(FileMetadata).filter(
-                    FileMetadata.file_id == file.id
-                ).all()
-                
-                file_identifiers = {m.key: m.value for m in metadata}
+                # File metadata is loaded with the workflow files
+                file_identifiers = {m.key: m.value for m in file.file_metadata}
                 
                 # Check for exact column matches
                 if 'columns' in dataset_identifiers and 'columns' in file_identifiers:
@@ -84,11 +80,7 @@ class MatchingService:
         
         for file in workflow_files:
             if file.file_type.value in ['csv', 'excel']:
-                metadata = db.query(FileMetadata).filter(
-                    FileMetadata.file_id == file.id
-                ).all()
-                
-                file_identifiers = {m.key: m.value for m in metadata}
+                file_identifiers = {m.key: m.value for m in file.file_metadata}
                 
                 # Compare column names
                 if 'columns' in dataset_identifiers and 'columns' in file_identifiers:
@@ -156,8 +148,9 @@ class MatchingService:
         if not dataset:
             return []
         
-        # Get workflow files
-        workflow_files = db.query(File).filter(
+        # Get workflow files, with the metadata of all of them in one more query
+        # rather than one query per file in each matcher
+        workflow_files = db.query(File).options(selectinload(File.file_metadata)).filter(
             File.workflow_id == workflow_id,
             File.status != 'deleted'
         ).all()
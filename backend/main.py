@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from app.api import files, workflows, datasets
 from app.api import bio_matcher
+from app.responses import FastJSONResponse
 from app.api import intelligent_merge
 from app.api import data_qa
 from app.api import general_chat
@@ -13,7 +15,9 @@ from sqlalchemy.orm import Session
 app = FastAPI(
     title="DataWeaver.AI API",
     description="Data management system for workflows and biological entities",
-    version="1.0.0"
+    version="1.0.0",
+    # Encode every JSON response with orjson when it is installed
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -25,6 +29,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress responses for clients that accept gzip; merged tables and plot JSON are large and repetitive
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Include routers
 app.include_router(files.router, prefix="/api")
 app.include_router(workflows.router, prefix="/api")
@@ -1,4 +1,5 @@
 import uuid
+import hashlib
 from typing import Dict, Any, Optional, List
 import pandas as pd
 import json
@@ -74,16 +75,26 @@ class WorkflowStateManager:
             return []
         return session['steps']
     
-    def store_uploaded_file(self, session_id: str, file_data: Dict[str, Any]) -> bool:
-        """Store individual uploaded file data in session"""
+    def store_uploaded_file(self, session_id: str, file_data: Dict[str, Any],
+                            df: Optional[pd.DataFrame] = None) -> bool:
+        """
+        Store individual uploaded file data in session.
+        Each upload gets its own key, and when the parsed DataFrame is given
+        it is kept as is, so merges can use it without rebuilding it from rows.
+        """
         session = self.get_session(session_id)
         if not session:
             return False
         
         if 'uploaded_files' not in session['data']:
             session['data']['uploaded_files'] = []
+            session['data']['uploaded_frames'] = []
         
         session['data']['uploaded_files'].append(file_data)
+        session['data']['uploaded_frames'].append({
+            'file_key': uuid.uuid4().hex,
+            'frame': df
+        })
         session['last_updated'] = datetime.now()
         return True
     
@@ -94,14 +105,71 @@ class WorkflowStateManager:
             return []
         return session['data'].get('uploaded_files', [])
     
-    def store_merged_data(self, session_id: str, merged_data: Dict[str, Any]) -> bool:
-        """Store merged CSV data in session"""
-        return self.update_session_data(session_id, 'merged_data', merged_data)
-    
-    def get_merged_data(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Get stored merged data from session"""
+    def get_uploaded_frames(self, session_id: str) -> List[pd.DataFrame]:
+        """Get all uploaded files as DataFrames, rebuilt from their rows only where none was stored"""
+        frames = []
+        stored_frames = self.get_session_data(session_id, 'uploaded_frames') or []
+        for file_data, stored in zip(self.get_uploaded_files(session_id), stored_frames):
+            if stored['frame'] is not None:
+                frames.append(stored['frame'])
+            else:
+                frames.append(pd.DataFrame(file_data['rows'], columns=file_data['headers']))
+        return frames
+    
+    def get_uploaded_files_key(self, session_id: str) -> Optional[str]:
+        """Key identifying the session's current set of uploads; changes whenever a file is added"""
+        stored_frames = self.get_session_data(session_id, 'uploaded_frames')
+        if not stored_frames:
+            return None
+        file_keys = sorted(stored['file_key'] for stored in stored_frames)
+        return hashlib.blake2b("|".join(file_keys).encode(), digest_size=16).hexdigest()
+    
+    def store_merged_data(self, session_id: str, merged_data: Dict[str, Any],
+                          merged_df: Optional[pd.DataFrame] = None,
+                          source_key: Optional[str] = None) -> bool:
+        """
+        Store merged CSV data in session.
+        When the merged DataFrame is given it is kept as is, so later steps get
+        it from get_merged_frame without rebuilding it from the rows.
+        source_key records which uploads were merged (see get_uploaded_files_key).
+        """
+        if not self.update_session_data(session_id, 'merged_data', merged_data):
+            return False
+        self.update_session_data(session_id, 'merged_source_key', source_key)
+        self.update_session_data(session_id, 'correlation_matrix', None)
+        return self.update_session_data(session_id, 'merged_frame', merged_df)
+    
+    def get_merged_data(self, session_id: str, source_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get stored merged data from session.
+        If source_key is given, only return it when it was merged from those uploads.
+        """
+        if source_key is not None and self.get_session_data(session_id, 'merged_source_key') != source_key:
+            return None
         return self.get_session_data(session_id, 'merged_data')
     
+    def get_merged_frame(self, session_id: str) -> Optional[pd.DataFrame]:
+        """
+        Get the merged data as a DataFrame.
+        The stored frame is shared between requests, so callers must not modify it.
+        """
+        merged_df = self.get_session_data(session_id, 'merged_frame')
+        if merged_df is not None:
+            return merged_df
+        
+        merged_data = self.get_merged_data(session_id)
+        if not merged_data:
+            return None
+        return pd.DataFrame(merged_data['rows'], columns=merged_data['headers'])
+    
+    def store_correlation_matrix(self, session_id: str, correlation_matrix: pd.DataFrame) -> bool:
+        """Store the correlation matrix of the merged data; cleared when new merged data is stored"""
+        return self.update_session_data(session_id, 'correlation_matrix', correlation_matrix)
+    
+    def get_correlation_matrix(self, session_id: str) -> Optional[pd.DataFrame]:
+        """Get the stored correlation matrix of the merged data"""
+        return self.get_session_data(session_id, 'correlation_matrix')
+    
     def store_visualization_data(self, session_id: str, viz_data: Dict[str, Any]) -> bool:
         """Store visualization data in session"""
         return self.update_session_data(session_id, 'visualization_data', viz_data)
@@ -110,14 +178,34 @@ class WorkflowStateManager:
         """Get stored visualization data from session"""
         return self.get_session_data(session_id, 'visualization_data')
     
-    def store_filtered_data(self, session_id: str, filtered_data: Dict[str, Any]) -> bool:
-        """Store filtered/queried data in session"""
-        return self.update_session_data(session_id, 'filtered_data', filtered_data)
+    def store_filtered_data(self, session_id: str, filtered_data: Dict[str, Any],
+                            filtered_df: Optional[pd.DataFrame] = None) -> bool:
+        """
+        Store filtered/queried data in session.
+        When the filtered DataFrame is given it is kept as is, like the merged frame.
+        """
+        if not self.update_session_data(session_id, 'filtered_data', filtered_data):
+            return False
+        return self.update_session_data(session_id, 'filtered_frame', filtered_df)
     
     def get_filtered_data(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get stored filtered data from session"""
         return self.get_session_data(session_id, 'filtered_data')
     
+    def get_filtered_frame(self, session_id: str) -> Optional[pd.DataFrame]:
+        """
+        Get the filtered data as a DataFrame.
+        The stored frame is shared between requests, so callers must not modify it.
+        """
+        filtered_df = self.get_session_data(session_id, 'filtered_frame')
+        if filtered_df is not None:
+            return filtered_df
+        
+        filtered_data = self.get_filtered_data(session_id)
+        if not filtered_data:
+            return None
+        return pd.DataFrame(filtered_data['rows'], columns=filtered_data['headers'])
+    
     def clear_session(self, session_id: str) -> bool:
         """Clear all data from a session"""
         if session_id in self.sessions:
@@ -544,4 +544,131 @@ class TestStatsEndpoints:
         data = response.json()
         assert data["total_designs"] == 1
         assert data["total_builds"] == 1
-        assert data["total_tests"] == 1 
\ No newline at end of file
+        assert data["total_tests"] == 1 
+
+class TestSessionStatusEndpoints:
+    """Test conditional requests on polled session endpoints"""
+
+    def test_workflow_status_not_modified(self, client):
+        """Test that an unchanged session answers If-None-Match with 304 and a new step changes the ETag"""
+        session_id = client.post("/api/bio/create-workflow-session").json()["session_id"]
+        response = client.get(f"/api/bio/workflow-status/{session_id}")
+        etag = response.headers["etag"]
+
+        cached = client.get(f"/api/bio/workflow-status/{session_id}", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+
+        client.post(
+            "/api/bio/upload-single-file",
+            files={"file": ("a.csv", b"Sample_ID,Score\nS1,1.5\n", "text/csv")},
+            data={"session_id": session_id}
+        )
+        changed = client.get(f"/api/bio/workflow-status/{session_id}", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+
+    def test_data_context_not_modified(self, client):
+        """Test that the data context summary is revalidated by its ETag"""
+        session_id = client.post("/api/bio/create-workflow-session").json()["session_id"]
+        etag = client.get(f"/api/bio/data-context/{session_id}").headers["etag"]
+
+        response = client.get(f"/api/bio/data-context/{session_id}", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+
+class TestWorkflowEndpoints:
+    """Test the workflow endpoints that load a workflow by id"""
+
+    def test_workflow_lifecycle(self, client):
+        """Test get, update, steps and delete of one workflow, and 404 once it is gone"""
+        workflow_id = client.post("/api/workflows/", json={"name": "Screen"}).json()["id"]
+
+        assert client.get(f"/api/workflows/{workflow_id}").json()["name"] == "Screen"
+        assert client.put(f"/api/workflows/{workflow_id}", json={"name": "Rescreen"}).json()["name"] == "Rescreen"
+        assert client.get(f"/api/workflows/{workflow_id}/steps").json() == []
+
+        assert client.delete(f"/api/workflows/{workflow_id}").status_code == 204
+        assert client.get(f"/api/workflows/{workflow_id}").status_code == 404
+        assert client.get(f"/api/workflows/{workflow_id}/steps").status_code == 404
+
+    def test_updates_are_read_back(self, client):
+        """Test that workflow and step updates return the stored values and 404 for unknown ids"""
+        workflow_id = client.post("/api/workflows/", json={"name": "Screen"}).json()["id"]
+        step = client.post(
+            f"/api/workflows/{workflow_id}/steps",
+            json={"name": "Assay", "step_type": "PROCESSING", "order_index": 0}
+        ).json()
+
+        updated = client.put(f"/api/workflows/{workflow_id}", json={"status": "RUNNING"}).json()
+        assert (updated["name"], updated["status"]) == ("Screen", "RUNNING")
+        assert client.put(f"/api/workflows/{workflow_id}", json={}).json()["status"] == "RUNNING"
+
+        step_url = f"/api/workflows/{workflow_id}/steps/{step['id']}"
+        assert client.put(step_url, json={"status": "COMPLETED"}).json()["status"] == "COMPLETED"
+        assert client.get(step_url).json()["status"] == "COMPLETED"
+
+        assert client.put("/api/workflows/999999", json={"name": "Gone"}).status_code == 404
+        assert client.put(f"/api/workflows/999999/steps/{step['id']}", json={}).status_code == 404
+
+
+class TestDatasetMatchEndpoints:
+    """Test paging of dataset match listings"""
+
+    def test_matches_are_paged(self, client, db_session):
+        """Test that skip and limit page through a dataset's matches in id order"""
+        from app.api.datasets import get_dataset_matches
+        from app.models.dataset import Dataset, DatasetMatch, MatchType
+        from app.models.workflow import Workflow
+
+        dataset, workflow = Dataset(name="screen.csv"), Workflow(name="Screen")
+        db_session.add_all([dataset, workflow])
+        db_session.commit()
+        db_session.add_all([
+            DatasetMatch(dataset_id=dataset.id, workflow_id=workflow.id, match_type=MatchType.EXACT, confidence_score=1.0)
+            for _ in range(5)
+        ])
+        db_session.commit()
+
+        first = get_dataset_matches(dataset.id, skip=0, limit=2, db=db_session)
+        rest = get_dataset_matches(dataset.id, skip=2, limit=100, db=db_session)
+        assert len(first) == 2 and len(rest) == 3
+        assert [m.id for m in first + rest] == sorted(m.id for m in first + rest)
+
+        assert client.get(f"/api/datasets/workflow/{workflow.id}/matches", params={"limit": 5000}).status_code == 422
+
+
+class TestMergeEndpoints:
+    """Test input errors of the merge endpoints"""
+
+    @pytest.fixture
+    def duplicate_key_files(self):
+        csv = "Sample_ID,Score\n" + "S1,1.0\n" * 40
+        return [("a.csv", csv.encode()), ("b.csv", csv.replace("Score", "Yield").encode())]
+
+    def test_merge_files_rejects_duplicate_key_blowup(self, client, duplicate_key_files, monkeypatch):
+        """Test that a merge multiplied out by duplicate keys is a 400, not a server error"""
+        from app.api import bio_matcher
+        monkeypatch.setattr(bio_matcher, "MAX_MERGE_ROWS", 1000)
+
+        response = client.post(
+            "/api/bio/merge-files",
+            files=[("files", (name, data, "text/csv")) for name, data in duplicate_key_files]
+        )
+        assert response.status_code == 400
+        assert "duplicate" in response.json()["detail"]
+
+    def test_merge_session_files_rejects_duplicate_key_blowup(self, client, duplicate_key_files, monkeypatch):
+        """Test the same rejection when merging a session's uploaded files"""
+        from app.api import bio_matcher
+        monkeypatch.setattr(bio_matcher, "MAX_MERGE_ROWS", 1000)
+        session_id = client.post("/api/bio/create-workflow-session").json()["session_id"]
+        for name, data in duplicate_key_files:
+            client.post(
+                "/api/bio/upload-single-file",
+                files={"file": (name, data, "text/csv")},
+                data={"session_id": session_id}
+            )
+
+        response = client.post("/api/bio/merge-session-files", data={"session_id": session_id})
+        assert response.status_code == 400
+        assert "duplicate" in response.json()["detail"]
@@ -0,0 +1,511 @@
+import io
+import json
+
+import pyarrow as pa
+import pytest
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+import plotly.utils
+from fastapi import HTTPException
+
+from app.api import bio_matcher
+from app.api.bio_matcher import (
+    ARROW_STREAM_MEDIA_TYPE, NDJSON_MEDIA_TYPE, analyze_boxplot, analyze_correlation_matrix, analyze_scatter_plot,
+    box_summary_trace, categorize_repeated_strings, comparable_values, count_matched_rows, dataframe_to_rows,
+    grouped_box_figure, histogram_figure, figure_to_json, isin_ignoring_case, iter_csv_chunks, iter_ndjson,
+    match_query_column, outer_merge, outer_merge_all, parse_and_apply_query, read_csv_table, table_response,
+    tokenize_query
+)
+
+
+class TestDataframeToRows:
+    """Test conversion of DataFrames to JSON-ready row lists"""
+
+    def test_missing_values_become_none(self):
+        """Test that NaN and None cells are returned as None"""
+        df = pd.DataFrame({"ID": ["A", None], "Score": [1.5, np.nan]})
+
+        assert dataframe_to_rows(df) == [["A", 1.5], [None, None]]
+
+    def test_python_types(self):
+        """Test that numeric cells are plain Python numbers and others are strings"""
+        df = pd.DataFrame({
+            "Count": [1, 2],
+            "Score": [0.5, 2.0],
+            "Passed": [True, False],
+            "Date": pd.to_datetime(["2024-01-01", "2024-01-02"])
+        })
+        rows = dataframe_to_rows(df)
+
+        assert rows[0] == [1, 0.5, 1, "2024-01-01 00:00:00"]
+        assert [type(cell) for cell in rows[0]] == [int, float, int, str]
+
+        # A bool column with gaps is object dtype; its cells still come out as 0/1
+        gaps = pd.DataFrame({"Passed": [True, np.nan, False], "Mixed": [1, "x", 2.5]})
+        assert gaps["Passed"].dtype == object
+        assert dataframe_to_rows(gaps) == [[1, 1], [None, "x"], [0, 2.5]]
+        assert [type(cell) for cell in dataframe_to_rows(gaps)[0]] == [int, int]
+
+
+class TestReadCsvTable:
+    """Test CSV parsing of uploads"""
+
+    def test_matches_pandas(self):
+        """Test that dtypes, missing values and date text come out as with pd.read_csv"""
+        content = b"ID,Date,Score,Count,Label\nS1,2024-01-01,1.5,3,NA\nS2,2024-01-02,,4,x\n"
+        df = read_csv_table(content)
+        expected = pd.read_csv(io.BytesIO(content))
+
+        assert df.dtypes.tolist() == expected.dtypes.tolist()
+        assert df["Date"].tolist() == ["2024-01-01", "2024-01-02"]
+        assert df["Score"].isna().tolist() == [False, True]
+        assert df["Label"].isna().tolist() == [True, False]
+
+    def test_integers_beyond_int64_are_kept_exactly(self):
+        """Test that integers Arrow would read as doubles come out exact, typed like pd.read_csv"""
+        content = b"Big,Huge,Signed,Score\n12345678901234567890,123456789012345678901234,-5,1e19\n5,5,12345678901234567890,2.5\n"
+        df = read_csv_table(content)
+        expected = pd.read_csv(io.BytesIO(content))
+
+        assert df.dtypes.tolist() == expected.dtypes.tolist()
+        assert df["Big"].tolist() == [12345678901234567890, 5]
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_file_object_with_repeated_headers(self):
+        """Test that files Arrow rejects are re-read from the start by pandas"""
+        df = read_csv_table(io.BytesIO(b"ID,Score,Score\nS1,1,2\n"))
+
+        assert df.columns.tolist() == ["ID", "Score", "Score.1"]
+
+
+class TestOuterMerge:
+    """Test the outer join used to merge uploaded files"""
+
+    @pytest.fixture
+    def frames(self):
+        left = pd.DataFrame({"ID": ["S2", "S1", "S3"], "Score": [2.0, 1.0, 3.0], "Batch": [1, 1, 2]})
+        right = pd.DataFrame({"ID": ["S3", "S4", "S1"], "Batch": [5, 6, 7]})
+        return left, right
+
+    def test_matches_pandas_outer_merge(self, frames):
+        """Test that unique keys give the same rows, order and columns as pd.merge"""
+        left, right = frames
+        expected = pd.merge(left, right, on="ID", how="outer")
+
+        pd.testing.assert_frame_equal(outer_merge(left, right, "ID"), expected)
+
+    def test_duplicate_keys_fall_back_to_pandas(self, frames):
+        """Test that repeated keys still produce every combination"""
+        left, right = frames
+        right = pd.concat([right, right.head(1)], ignore_index=True)
+        expected = pd.merge(left, right, on="ID", how="outer")
+
+        pd.testing.assert_frame_equal(outer_merge(left, right, "ID"), expected)
+
+    def test_duplicate_key_blowup_is_rejected(self, frames, monkeypatch):
+        """Test that a merge multiplying out past the row limit fails before merging"""
+        left, right = frames
+        left = pd.concat([left] * 3, ignore_index=True)
+        right = pd.concat([right] * 3, ignore_index=True)
+        monkeypatch.setattr(bio_matcher, "MAX_MERGE_ROWS", 10)
+
+        with pytest.raises(HTTPException) as exc_info:
+            outer_merge(left, right, "ID")
+        assert exc_info.value.status_code == 400
+
+    def test_merge_all_matches_chained_pandas_merges(self, frames):
+        """Test that joining three files at once gives the same frame as pairwise pd.merge"""
+        left, right = frames
+        right = right.rename(columns={"Batch": "Plate"})
+        third = pd.DataFrame({"ID": ["S5", "S2"], "Yield": [0.5, 0.7]})
+        expected = pd.merge(pd.merge(left, right, on="ID", how="outer"), third, on="ID", how="outer")
+
+        pd.testing.assert_frame_equal(outer_merge_all([left, right, third], "ID"), expected)
+
+    def test_merge_all_with_shared_columns(self, frames):
+        """Test that files sharing a value column still get pandas' suffixes"""
+        left, right = frames
+        expected = pd.merge(left, right, on="ID", how="outer")
+
+        pd.testing.assert_frame_equal(outer_merge_all([left, right], "ID"), expected)
+
+    def test_count_matched_rows(self, frames):
+        """Test that only keys present in every file count as matched"""
+        left, right = frames
+        merged = outer_merge(left, right, "ID")
+
+        assert len(merged) == 4
+        assert count_matched_rows([left, right], merged, "ID") == 2
+
+
+class TestGroupedBoxFigure:
+    """Test box plots drawn from precomputed group statistics"""
+
+    def test_quartiles_and_whiskers(self):
+        """Test that each group's box matches its quartiles and 1.5 x IQR whiskers"""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"Mutation": rng.choice(["B", "A"], 200), "Activity_Score": rng.normal(size=200)})
+        df.loc[0, "Activity_Score"] = 50.0
+
+        box = grouped_box_figure(df, "Mutation", "Activity_Score", "title").data[0]
+
+        assert list(box.x) == list(df["Mutation"].unique())
+        for i, group in enumerate(box.x):
+            values = df.loc[df["Mutation"] == group, "Activity_Score"]
+            q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+            upper = values[values <= q3 + 1.5 * (q3 - q1)].max()
+            assert box.q1[i] == pytest.approx(q1)
+            assert box.median[i] == pytest.approx(median)
+            assert box.upperfence[i] == pytest.approx(upper)
+
+    def test_categorical_groups(self):
+        """Test that category-typed group columns give the same boxes"""
+        df = pd.DataFrame({"Mutation": ["A", "B", "A", "B", "A"], "Activity_Score": [1.0, 2.0, 3.0, 4.0, 5.0]})
+        as_category = df.astype({"Mutation": "category"})
+
+        expected = grouped_box_figure(df, "Mutation", "Activity_Score", "title").data[0]
+        box = grouped_box_figure(as_category, "Mutation", "Activity_Score", "title").data[0]
+
+        assert list(box.x) == list(expected.x)
+        np.testing.assert_allclose(box.upperfence, expected.upperfence)
+
+
+class TestBoxSummaryTrace:
+    """Test single-column box plots drawn from precomputed statistics"""
+
+    def test_quartiles_and_whiskers(self):
+        """Test that the box matches the column's quartiles and 1.5 x IQR whiskers, ignoring NaN"""
+        values = np.random.default_rng(0).normal(size=300)
+        values[0] = 50.0
+        series = pd.Series(np.append(values, np.nan))
+
+        box = box_summary_trace(series, "Activity_Score")
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+
+        assert box.y is None
+        assert box.q1[0] == pytest.approx(q1)
+        assert box.median[0] == pytest.approx(median)
+        assert box.upperfence[0] == pytest.approx(values[values <= q3 + 1.5 * (q3 - q1)].max())
+
+
+class TestAnalyzeBoxplot:
+    """Test group comparisons in the box plot explanation"""
+
+    def test_group_means_and_outliers(self):
+        """Test that each group's outliers are counted against its own quartiles"""
+        df = pd.DataFrame({
+            "Mutation": ["A"] * 5 + ["B"] * 5 + [None],
+            "Activity_Score": [1.0, 2.0, 3.0, 4.0, 100.0, 10.0, 11.0, 12.0, 13.0, np.nan, 0.0]
+        })
+        analysis = analyze_boxplot(df, "Mutation", "Activity_Score")
+
+        assert analysis["group_comparisons"][:2] == ["Highest mean: A (22.00)", "Lowest mean: B (11.50)"]
+        assert analysis["outliers"] == ["Group 'A': 1 outliers"]
+
+
+class TestColumnMoments:
+    """Test that the compiled statistics pass agrees with the NumPy fallback"""
+
+    @pytest.mark.parametrize("size", [1, 2, 7, 1000])
+    def test_compiled_matches_numpy(self, size):
+        """Test both implementations on the same values and outlier bounds"""
+        pytest.importorskip("numba")
+        values = np.random.default_rng(size).normal(50.0, 20.0, size)
+        lower, upper = 20.0, 80.0
+
+        compiled = bio_matcher._column_moments(values, lower, upper)
+        expected = bio_matcher._column_moments_numpy(values, lower, upper)
+
+        assert bio_matcher._column_moments is not bio_matcher._column_moments_numpy
+        np.testing.assert_allclose(compiled[:4], expected[:4], rtol=1e-9)
+        assert compiled[4] == expected[4]
+
+
+class TestAnalyzeScatterPlot:
+    """Test the scatter plot explanation"""
+
+    def test_correlation_matches_pandas(self):
+        """Test that the correlation skips rows missing either value, like Series.corr"""
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"Activity_Score": rng.normal(size=100), "Stability_Index": rng.normal(size=100)})
+        df.loc[:9, "Activity_Score"] = np.nan
+        df.loc[5:14, "Stability_Index"] = np.nan
+
+        correlation = analyze_scatter_plot(df, "Activity_Score", "Stability_Index")["correlations"][0]["correlation"]
+
+        assert correlation == pytest.approx(df["Activity_Score"].corr(df["Stability_Index"]))
+
+    def test_constant_column(self):
+        """Test that a zero-variance column has undefined correlation"""
+        df = pd.DataFrame({"Activity_Score": [1.0, 2.0, 3.0], "Stability_Index": [1.0, 1.0, 1.0]})
+
+        assert np.isnan(analyze_scatter_plot(df, "Activity_Score", "Stability_Index")["correlations"][0]["correlation"])
+
+
+class TestAnalyzeCorrelationMatrix:
+    """Test the correlation matrix explanation"""
+
+    def test_strongest_pairs_listed_first(self):
+        """Test that only the five strongest pairs are listed, in order of |r|"""
+        rng = np.random.default_rng(0)
+        base = rng.normal(size=500)
+        df = pd.DataFrame({f"C{i}": base + rng.normal(scale=0.05 * i, size=500) for i in range(6)})
+        analysis = analyze_correlation_matrix(df)
+
+        corr = df.corr().to_numpy()
+        expected = np.sort(np.abs(corr[np.triu_indices_from(corr, k=1)]))[::-1][:5]
+        listed = [abs(float(pair.split("r=")[1].rstrip(")"))) for pair in analysis["strong_correlations"]]
+
+        assert analysis["insights"][0] == "Found 15 strong correlations (|r| > 0.7)"
+        np.testing.assert_allclose(listed, expected, atol=1e-3)
+
+
+class TestCategorizeRepeatedStrings:
+    """Test conversion of low-cardinality string columns to category"""
+
+    def test_only_repeated_strings_are_converted(self):
+        """Test that IDs stay strings while repeated labels become categories"""
+        df = pd.DataFrame({
+            "Sample_ID": [f"S{i}" for i in range(6)],
+            "Mutation": ["A", "B", "A", "B", "A", None],
+            "Score": np.arange(6.0)
+        })
+        result = categorize_repeated_strings(df)
+
+        assert result["Sample_ID"].dtype == object
+        assert isinstance(result["Mutation"].dtype, pd.CategoricalDtype)
+        assert result["Score"].dtype == np.float64
+        assert result["Mutation"].isna().sum() == 1
+
+
+class TestHistogramFigure:
+    """Test server-side binned histograms"""
+
+    def test_bins_match_numpy(self):
+        """Test that bar heights are np.histogram counts over the non-missing values"""
+        values = np.random.default_rng(0).normal(size=500)
+        df = pd.DataFrame({"Activity_Score": values})
+        df.loc[0, "Activity_Score"] = np.nan
+
+        bar = histogram_figure(df, "Activity_Score", "title").data[0]
+        counts, edges = np.histogram(values[1:], bins=20)
+
+        assert bar.type == "bar"
+        np.testing.assert_array_equal(bar.y, counts)
+        np.testing.assert_allclose(bar.x, edges[:-1])
+
+    def test_non_numeric_column_uses_plotly_histogram(self):
+        """Test that category counts are still left to Plotly"""
+        df = pd.DataFrame({"Mutation": ["A", "B", "A"]})
+
+        assert histogram_figure(df, "Mutation", "title").data[0].type == "histogram"
+
+
+class TestTableResponse:
+    """Test JSON and Arrow encodings of table responses"""
+
+    @pytest.fixture
+    def content(self):
+        return {"headers": ["ID", "Score"], "rows": [["S1", 1.5], ["S2", None]], "totalRows": 2}
+
+    def test_arrow_when_accepted(self, content):
+        """Test that the table is streamed as Arrow with the other fields in its metadata"""
+        df = pd.DataFrame({"ID": ["S1", "S2"], "Score": [1.5, np.nan]})
+        response = table_response(df, content, ARROW_STREAM_MEDIA_TYPE)
+        table = pa.ipc.open_stream(response.body).read_all()
+
+        assert response.media_type == ARROW_STREAM_MEDIA_TYPE
+        pd.testing.assert_frame_equal(table.to_pandas(), df)
+        assert json.loads(table.schema.metadata[b"response"]) == {"headers": ["ID", "Score"], "totalRows": 2}
+
+    def test_downcast_arrow_columns(self, content):
+        """Test that downcast narrows the numeric Arrow columns"""
+        df = pd.DataFrame({"ID": ["S1", "S2"], "Score": [1.5, np.nan], "Count": [1, 100]})
+        response = table_response(df, content, ARROW_STREAM_MEDIA_TYPE, downcast=True)
+        schema = pa.ipc.open_stream(response.body).schema
+
+        assert schema.field("Score").type == pa.float32()
+        assert schema.field("Count").type == pa.int8()
+
+    def test_json_by_default(self, content):
+        """Test that clients not asking for Arrow get the JSON rows"""
+        response = table_response(pd.DataFrame(), content, "application/json")
+
+        assert json.loads(response.body) == content
+
+    def test_ndjson_when_accepted(self, content):
+        """Test that NDJSON has the fields on the first line and one row per line after it"""
+        response = table_response(pd.DataFrame(), content, NDJSON_MEDIA_TYPE)
+        body = b"".join(iter_ndjson(content, chunk_rows=1))
+        lines = [json.loads(line) for line in body.decode().splitlines()]
+
+        assert response.media_type == NDJSON_MEDIA_TYPE
+        assert lines == [{"headers": ["ID", "Score"], "totalRows": 2}, ["S1", 1.5], ["S2", None]]
+
+
+class TestFigureToJson:
+    """Test Plotly figure encoding"""
+
+    def test_matches_plotly_encoder(self):
+        """Test that the figure decodes to the same JSON as with PlotlyJSONEncoder"""
+        fig = go.Figure(go.Scatter(
+            x=pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]),
+            y=np.array([1.5, np.nan, 3.0], dtype=np.float32),
+            text=np.array(["a", None, "c"], dtype=object)
+        ))
+        fig.add_trace(go.Heatmap(z=np.array([[1.0, np.nan], [0.5, 1.0]]), x=pd.Index(["A", "B"])))
+
+        expected = json.loads(json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder))
+
+        assert json.loads(figure_to_json(fig)) == expected
+
+
+class TestIterCsvChunks:
+    """Test streamed CSV downloads"""
+
+    def test_chunks_join_to_full_csv(self):
+        """Test that the chunks, header included once, add up to df.to_csv"""
+        df = pd.DataFrame({"ID": [f"S{i}" for i in range(7)], "Score": [1.5, np.nan, 3.0, 4.0, 5.0, 6.0, 7.0]})
+
+        chunks = list(iter_csv_chunks(df, chunk_rows=3))
+
+        assert len(chunks) == 3
+        assert b"".join(chunks).decode() == df.to_csv(index=False)
+
+    def test_empty_frame_keeps_header(self):
+        """Test that an empty result still downloads its header row"""
+        df = pd.DataFrame({"ID": [], "Score": []})
+
+        assert b"".join(iter_csv_chunks(df)).decode() == df.to_csv(index=False)
+
+
+class TestQueryParsing:
+    """Test the filter query language of query-data"""
+
+    @pytest.fixture
+    def df(self):
+        return pd.DataFrame({
+            "Mutation": ["A", "B", "C", "A", "B", "C"],
+            "Count": [1, 5, 50, 45, 8, 3]
+        })
+
+    @pytest.mark.parametrize("requested", [
+        "activty score", "stabilty", "expresion", "temp", "fitnes", "mutatoin",
+        "sampl id", "concentraton", "bindng affinity", "expr lvl", "ph level"
+    ])
+    def test_rapidfuzz_matches_fuzzywuzzy(self, monkeypatch, requested):
+        """Test that misspelled column names resolve to the same column with either fuzz library"""
+        pytest.importorskip("rapidfuzz")
+        fuzzywuzzy = pytest.importorskip("fuzzywuzzy.fuzz")
+        columns = ("Sample_ID", "Mutation", "Activity_Score", "Stability_Score", "Expression_Level",
+                   "Temperature", "pH", "Binding_Affinity", "Fitness", "Concentration_uM")
+
+        match_query_column.cache_clear()
+        rapidfuzz_match = match_query_column(requested, columns)
+        monkeypatch.setattr(bio_matcher, "RAPIDFUZZ_AVAILABLE", False)
+        monkeypatch.setattr(bio_matcher, "fuzz", fuzzywuzzy)
+        match_query_column.cache_clear()
+        fuzzywuzzy_match = match_query_column(requested, columns)
+        match_query_column.cache_clear()
+
+        assert rapidfuzz_match == fuzzywuzzy_match != requested
+
+    def test_tokens(self):
+        """Test that quoted text and in-lists stay inside their condition"""
+        tokens = tokenize_query("not (name = 'black and white' or mutation in (a, b)) and count < 10")
+
+        assert [kind for kind, _ in tokens] == ["not", "(", "cond", "or", "cond", ")", "and", "cond"]
+        assert tokens[2][1] == "name = 'black and white'"
+        assert tokens[4][1] == "mutation in (a, b)"
+
+    def test_parenthesized_groups(self, df):
+        """Test that two groups giving equally long results are both applied"""
+        result = parse_and_apply_query(df, "where (mutation = A or mutation = B) and (count < 2 or count > 40)")
+
+        assert result.index.tolist() == [0, 3]
+
+    def test_in_list_and_not(self, df):
+        """Test an in-list combined with a negated condition"""
+        result = parse_and_apply_query(df, "mutation in (A, C) and not count > 40")
+
+        assert result.index.tolist() == [0, 5]
+
+    def test_column_matching_is_cached(self):
+        """Test case-insensitive and fuzzy column matches, and that repeats come from the cache"""
+        columns = ("Sample_ID", "Activity_Score", "Mutation")
+        match_query_column.cache_clear()
+
+        assert match_query_column("mutation", columns) == "Mutation"
+        assert match_query_column("activity", columns) == "Activity_Score"
+        assert match_query_column("activity", columns) == "Activity_Score"
+        assert match_query_column.cache_info().hits == 1
+
+    def test_like_is_literal_and_case_insensitive(self):
+        """Test that like patterns match literally, ignoring case and missing values"""
+        df = pd.DataFrame({"Name": ["WT.1", "wtx1", None, "Mut.1"], "Count": [10, 11, 12, 110]})
+
+        assert parse_and_apply_query(df, "name like wt.1").index.tolist() == [0]
+        assert parse_and_apply_query(df, "count contains 11").index.tolist() == [1, 3]
+
+    def test_in_list_on_categorical_column(self, df):
+        """Test that categorical and plain string columns give the same in-list matches"""
+        categorical = df.astype({"Mutation": "category"})
+        categorical.loc[0, "Mutation"] = None
+
+        assert isin_ignoring_case(df["Mutation"], ["a", "C"]).tolist() == [True, False, True, True, False, True]
+        assert isin_ignoring_case(categorical["Mutation"], ["a", "C"]).tolist() == [False, False, True, True, False, True]
+        assert parse_and_apply_query(df, "count in (1, 45)").index.tolist() == [0, 3]
+
+    def test_later_conditions_only_see_live_rows(self, df, monkeypatch):
+        """Test that "and"/"or" evaluate their right side only on rows still undecided"""
+        seen = []
+        original = bio_matcher.isin_ignoring_case
+
+        def recording_isin(series, values):
+            seen.append(series.index.tolist())
+            return original(series, values)
+
+        monkeypatch.setattr(bio_matcher, "isin_ignoring_case", recording_isin)
+
+        assert parse_and_apply_query(df, "count > 4 and mutation in (a)").index.tolist() == [3]
+        assert parse_and_apply_query(df, "count > 40 or mutation in (a)").index.tolist() == [0, 2, 3]
+        assert seen == [[1, 2, 3, 4], [0, 1, 4, 5]]
+
+    def test_comparisons_on_nullable_columns(self):
+        """Test that numeric comparisons treat missing values in nullable columns as non-matching"""
+        df = pd.DataFrame({"Count": pd.array([1, None, 50, 8], dtype="Int64")})
+
+        assert comparable_values(df["Count"]).dtype == np.float64
+        assert parse_and_apply_query(df, "count >= 8").index.tolist() == [2, 3]
+        assert parse_and_apply_query(df, "not count = 1").index.tolist() == [1, 2, 3]
+
+    def test_unfiltered_query_returns_frame(self, df):
+        """Test that a query with no recognised condition leaves the frame as it is"""
+        assert parse_and_apply_query(df, "garbage query") is df
+        assert parse_and_apply_query(df, "garbage or count > 40").index.tolist() == [0, 1, 2, 3, 4, 5]
+        assert parse_and_apply_query(df, "garbage and count > 40").index.tolist() == [2, 3]
+
+
+class TestBuildVisualization:
+    """Test how plot data is prepared before rendering"""
+
+    def test_only_sampled_point_plots_are_downcast(self, monkeypatch):
+        """Test that float32 copies are made of the sampled scatter points only, never for aggregated plots"""
+        df = pd.DataFrame({"A": np.arange(1000, dtype=float), "B": np.arange(1000, dtype=float) * 2})
+        downcast_sizes = []
+        original = bio_matcher.downcast_float_columns
+
+        def recording_downcast(frame):
+            downcast_sizes.append(len(frame))
+            return original(frame)
+
+        monkeypatch.setattr(bio_matcher, "downcast_float_columns", recording_downcast)
+        numeric_cols = df.columns
+
+        for plot_type in ("histogram", "boxplot", "correlation"):
+            bio_matcher.build_visualization(df, plot_type, ["A"], numeric_cols, False, "fast", 100)
+        bio_matcher.build_visualization(df, "scatter", ["A", "B"], numeric_cols, False, "fast", 100)
+        bio_matcher.build_visualization(df, "scatter", ["A", "B"], numeric_cols, False, "full", 100)
+
+        assert downcast_sizes == [100]
@@ -0,0 +1,164 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import pandas as pd
+import numpy as np
+
+from app.services.data_analyzer import DataAnalyzer, DataFrameSchema, compute_correlation_matrix, downcast_numeric_columns
+
+
+@pytest.fixture
+def sample_df():
+    """Small mixed-type dataset for analysis tests"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "Sample_ID": [f"S{i}" for i in range(50)],
+        "Activity_Score": rng.normal(10, 2, 50),
+        "Stability_Index": rng.normal(5, 1, 50),
+        "Mutation": rng.choice(["A", "B", "C"], 50)
+    })
+
+
+class TestAnalysisCache:
+    """Test memoization of dataset analyses"""
+
+    def test_cache_hit_returns_same_analysis(self, sample_df):
+        """Test that analyzing identical data twice reuses the first result"""
+        analyzer = DataAnalyzer()
+        data_hash = analyzer.compute_data_hash(sample_df.to_csv(index=False).encode())
+
+        first = analyzer.analyze_dataset(sample_df, "session-1", data_hash=data_hash)
+        cached = analyzer.get_cached_analysis(data_hash, "session-2")
+
+        assert cached is not None
+        assert cached["session_id"] == "session-2"
+        assert cached["statistical_analysis"] == first["statistical_analysis"]
+
+    def test_different_data_misses_cache(self, sample_df):
+        """Test that changed data produces a different cache key"""
+        analyzer = DataAnalyzer()
+        original = analyzer.compute_data_hash(sample_df.to_csv(index=False).encode())
+        changed = analyzer.compute_data_hash(sample_df.head(10).to_csv(index=False).encode())
+
+        analyzer.analyze_dataset(sample_df, "session-1", data_hash=original)
+
+        assert original != changed
+        assert analyzer.get_cached_analysis(changed) is None
+
+    def test_cache_is_bounded(self, sample_df):
+        """Test that the least recently used analysis is evicted"""
+        analyzer = DataAnalyzer(cache_size=2)
+        for key in ["a", "b", "c"]:
+            analyzer.analyze_dataset(sample_df, data_hash=key)
+
+        assert analyzer.get_cached_analysis("a") is None
+        assert analyzer.get_cached_analysis("c") is not None
+
+    def test_invalidate_cache(self, sample_df):
+        """Test explicit cache invalidation"""
+        analyzer = DataAnalyzer()
+        analyzer.analyze_dataset(sample_df, data_hash="key")
+        analyzer.invalidate_cache("key")
+
+        assert analyzer.get_cached_analysis("key") is None
+
+    def test_cached_analysis_is_a_copy(self, sample_df):
+        """Test that modifying a returned analysis doesn't change later cache hits"""
+        analyzer = DataAnalyzer()
+        first = analyzer.analyze_dataset(sample_df, data_hash="key")
+        first["recommendations"].append("changed")
+        first["dataset_info"].clear()
+
+        second = analyzer.get_cached_analysis("key")
+        second["quality_analysis"].clear()
+        third = analyzer.get_cached_analysis("key")
+
+        assert "changed" not in third["recommendations"]
+        assert third["dataset_info"] and third["quality_analysis"]
+
+    def test_concurrent_analyses_share_the_cache(self, sample_df):
+        """Test that analyses from several threads all land in the bounded cache"""
+        analyzer = DataAnalyzer(cache_size=4)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda key: analyzer.analyze_dataset(sample_df, key, data_hash=key),
+                                    ["a", "b", "c", "d"]))
+
+        assert [result["session_id"] for result in results] == ["a", "b", "c", "d"]
+        assert all(analyzer.get_cached_analysis(key) is not None for key in "abcd")
+
+    def test_file_hash_matches_bytes_hash(self, sample_df):
+        """Test that hashing an upload's file object gives the bytes' hash and rewinds it"""
+        data = sample_df.to_csv(index=False).encode()
+        upload = io.BytesIO(data)
+
+        assert DataAnalyzer.compute_data_hash(upload) == DataAnalyzer.compute_data_hash(data)
+        assert upload.tell() == 0
+
+    def test_cached_schema_matches_data(self, sample_df):
+        """Test that the schema taken at parse time is kept with the cached analysis"""
+        analyzer = DataAnalyzer()
+        schema = DataFrameSchema.from_dataframe(sample_df)
+        result = analyzer.analyze_dataset(sample_df, data_hash="key", schema=schema)
+
+        assert analyzer.get_cached_schema("key") == schema
+        assert schema.shape == (50, 4)
+        assert result["dataset_info"]["shape"] == [50, 4]
+        assert list(result["dataset_info"]["column_types"]) == list(schema.columns)
+
+
+class TestCorrelationMatrix:
+    """Test the matrix-product correlation path against pandas"""
+
+    def test_matches_pandas_for_complete_data(self, sample_df):
+        """Test that complete numeric data gives the same matrix as .corr()"""
+        numeric_df = sample_df.select_dtypes(include=[np.number])
+        expected = numeric_df.corr()
+        result = compute_correlation_matrix(numeric_df)
+
+        assert list(result.columns) == list(expected.columns)
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+    def test_constant_column_is_nan(self, sample_df):
+        """Test that a zero-variance column has undefined correlation"""
+        numeric_df = sample_df.select_dtypes(include=[np.number]).assign(Constant=1.0)
+        result = compute_correlation_matrix(numeric_df)
+
+        assert result["Constant"].isna().all()
+
+    def test_missing_values_fall_back_to_pandas(self, sample_df):
+        """Test that data with NaNs uses pairwise-complete correlations"""
+        numeric_df = sample_df.select_dtypes(include=[np.number]).copy()
+        numeric_df.iloc[0, 0] = np.nan
+
+        pd.testing.assert_frame_equal(compute_correlation_matrix(numeric_df), numeric_df.corr())
+
+
+class TestAnalysisPrecision:
+    """Test the float32 fast path of the statistical analysis"""
+
+    def test_fast_precision_is_close_to_full(self, sample_df):
+        """Test that float32 statistics agree with float64 to display precision"""
+        analyzer = DataAnalyzer()
+        fast = analyzer.analyze_dataset(sample_df, precision="fast")["statistical_analysis"]["statistics"]
+        full = analyzer.analyze_dataset(sample_df, precision="full")["statistical_analysis"]["statistics"]
+
+        for col, stats in full.items():
+            for name, value in stats.items():
+                assert fast[col][name] == pytest.approx(value, rel=1e-4, abs=1e-5)
+
+    def test_reported_dtypes_are_unchanged(self, sample_df):
+        """Test that dataset_info reports the dtypes as loaded"""
+        result = DataAnalyzer().analyze_dataset(sample_df, precision="fast")
+
+        assert result["dataset_info"]["column_types"]["Activity_Score"] == "float64"
+
+    def test_downcast_numeric_columns(self, sample_df):
+        """Test that floats become float32 and integers the smallest type holding them"""
+        df = sample_df.assign(Count=np.arange(50), Offset=np.arange(50) - 1000)
+        result = downcast_numeric_columns(df)
+
+        assert result["Activity_Score"].dtype == np.float32
+        assert result["Count"].dtype == np.int8
+        assert result["Offset"].dtype == np.int16
+        assert result["Sample_ID"].dtype == object
@@ -0,0 +1,110 @@
+import pytest
+import pandas as pd
+import numpy as np
+
+from services.workflow_state import WorkflowStateManager
+
+
+@pytest.fixture
+def merged_df():
+    """Merged frame with a missing value in each column type"""
+    return pd.DataFrame({
+        "Sample_ID": ["S1", "S2", "S3"],
+        "Activity_Score": [1.5, np.nan, 3.0],
+        "Mutation": ["A", None, "C"]
+    })
+
+
+class TestMergedFrameStorage:
+    """Test storing merged data in a workflow session"""
+
+    def test_frame_round_trip(self, merged_df):
+        """Test that the stored DataFrame is reloaded with its dtypes"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        manager.store_merged_data(session_id, {"headers": [], "rows": []}, merged_df)
+
+        reloaded = manager.get_merged_frame(session_id)
+
+        pd.testing.assert_frame_equal(reloaded, merged_df)
+
+    def test_frame_rebuilt_from_rows(self):
+        """Test the fallback when only row lists were stored"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        manager.store_merged_data(session_id, {"headers": ["ID", "Score"], "rows": [["S1", 1.0], ["S2", None]]})
+
+        reloaded = manager.get_merged_frame(session_id)
+
+        assert reloaded.shape == (2, 2)
+        assert reloaded["Score"].isna().sum() == 1
+
+    def test_new_merge_clears_correlation_matrix(self, merged_df):
+        """Test that a stored correlation matrix is dropped when the merged data changes"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        manager.store_merged_data(session_id, {"headers": [], "rows": []}, merged_df)
+        manager.store_correlation_matrix(session_id, pd.DataFrame([[1.0]]))
+
+        assert manager.get_correlation_matrix(session_id) is not None
+
+        manager.store_merged_data(session_id, {"headers": [], "rows": []}, merged_df)
+
+        assert manager.get_correlation_matrix(session_id) is None
+
+    def test_missing_session(self):
+        """Test that unknown sessions have no merged frame"""
+        assert WorkflowStateManager().get_merged_frame("missing") is None
+
+
+class TestUploadedFileStorage:
+    """Test uploaded files and the merge key derived from them"""
+
+    def test_frames_round_trip(self, merged_df):
+        """Test that uploads stored with a DataFrame return it, others are rebuilt from rows"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        manager.store_uploaded_file(session_id, {"headers": [], "rows": []}, merged_df)
+        manager.store_uploaded_file(session_id, {"headers": ["ID"], "rows": [["S1"], ["S2"]]})
+
+        frames = manager.get_uploaded_frames(session_id)
+
+        assert frames[0] is merged_df
+        assert frames[1]["ID"].tolist() == ["S1", "S2"]
+
+    def test_new_upload_invalidates_merge(self, merged_df):
+        """Test that a stored merge is only reused for the uploads it was built from"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        for _ in range(2):
+            manager.store_uploaded_file(session_id, {"headers": [], "rows": []}, merged_df)
+        merge_key = manager.get_uploaded_files_key(session_id)
+        manager.store_merged_data(session_id, {"headers": [], "rows": []}, source_key=merge_key)
+
+        assert manager.get_merged_data(session_id, source_key=merge_key) is not None
+
+        manager.store_uploaded_file(session_id, {"headers": [], "rows": []}, merged_df)
+        new_key = manager.get_uploaded_files_key(session_id)
+
+        assert new_key != merge_key
+        assert manager.get_merged_data(session_id, source_key=new_key) is None
+
+
+class TestFilteredFrameStorage:
+    """Test storing query results in a workflow session"""
+
+    def test_frame_round_trip(self, merged_df):
+        """Test that the filtered DataFrame is returned as stored"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        manager.store_filtered_data(session_id, {"headers": [], "rows": []}, merged_df)
+
+        assert manager.get_filtered_frame(session_id) is merged_df
+
+    def test_frame_rebuilt_from_rows(self):
+        """Test the fallback when only row lists were stored"""
+        manager = WorkflowStateManager()
+        session_id = manager.create_session()
+        manager.store_filtered_data(session_id, {"headers": ["ID", "Score"], "rows": [["S1", 1.0]]})
+
+        assert manager.get_filtered_frame(session_id).shape == (1, 2)